@@ -0,0 +1,51 @@
+"""
+Encode/decode cost of the /cargos/calculate/batch body: JSON + pydantic vs the binary frame.
+
+    python -m benchmarks.calculate_codec [items] [rounds]
+"""
+import json
+import sys
+import timeit
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from cargoapi.schemas.cargos import CargoCalculateRate
+from cargoapi.utils import binary_protocol
+
+batch_adapter = TypeAdapter(list[CargoCalculateRate])
+
+
+def make_items(count: int) -> list[CargoCalculateRate]:
+    start = date(2020, 1, 1)
+    return [
+        CargoCalculateRate(tariff_date=start + timedelta(days=i % 365), cargo_type_name='Glass', total_price=1000 + i)
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    items = make_items(count)
+    results = [item.total_price * 0.04 for item in items]
+
+    json_request = json.dumps(jsonable_encoder(items)).encode('utf-8')
+    binary_request = binary_protocol.encode_calculate_request(items)
+    json_response = {'detail': 'Cargo tariffs was successfully calculated.', 'error': None, 'result': results}
+
+    cases = {
+        'json decode (pydantic)': lambda: batch_adapter.validate_json(json_request),
+        'binary decode': lambda: binary_protocol.decode_calculate_request(binary_request, max_items=count),
+        'json encode response': lambda: json.dumps(jsonable_encoder(json_response)).encode('utf-8'),
+        'binary encode response': lambda: binary_protocol.encode_calculate_response(results),
+    }
+    print(f'{count} items per body, request size: json {len(json_request)} B, binary {len(binary_request)} B')
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=rounds, repeat=5)) / rounds
+        print(f'{name:<24} {best * 1e6:10.1f} us/body {best * 1e9 / count:10.1f} ns/item')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Per-call SQLAlchemy overhead of the /cargos/calculate rate lookup, up to the point where the driver gets the SQL.
+
+Every execution builds the statement, derives its cache key and looks the compiled form up in the engine's
+compiled cache; 'no cache' compiles from scratch each time, which is what a cache miss costs.
+
+    python -m benchmarks.calculate_statements [rounds]
+"""
+import sys
+import timeit
+from datetime import date
+from typing import Any
+
+from sqlalchemy import lambda_stmt
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+from sqlmodel import select
+
+from cargoapi.models.api.v1.cargos import CargoTariff, CargoType
+
+dialect = PGDialect_asyncpg()
+
+
+def select_tariff(tariff_date: date, cargo_type_name: str) -> Any:
+    return (
+        select(CargoTariff)
+        .join(CargoType, CargoTariff.to_cargo_type_uid == CargoType.uid)  # type: ignore[arg-type]
+        .where(CargoTariff.tariff_date == tariff_date, CargoType.name == cargo_type_name)
+    )
+
+
+def select_rate(tariff_date: date, cargo_type_name: str) -> Any:
+    return (
+        select(CargoTariff.rate)
+        .join(CargoType, CargoTariff.to_cargo_type_uid == CargoType.uid)  # type: ignore[arg-type]
+        .where(CargoTariff.tariff_date == tariff_date, CargoType.name == cargo_type_name)
+    )
+
+
+def lambda_rate(tariff_date: date, cargo_type_name: str) -> Any:
+    return lambda_stmt(
+        lambda: select(CargoTariff.rate)
+        .join(CargoType, CargoTariff.to_cargo_type_uid == CargoType.uid)  # type: ignore[arg-type]
+        .where(CargoTariff.tariff_date == tariff_date, CargoType.name == cargo_type_name),
+    )
+
+
+def execute_prepare(build: Any, compiled_cache: Any) -> None:
+    statement = build(date(2024, 1, 1), 'Glass')
+    # The same call Connection.execute makes before handing the SQL and parameters to the driver
+    statement._compile_w_cache(dialect, compiled_cache=compiled_cache, column_keys=[])
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cases = {
+        'select(CargoTariff), no cache': (select_tariff, None),
+        'select(CargoTariff)': (select_tariff, {}),
+        'select(rate)': (select_rate, {}),
+        'lambda_stmt select(rate)': (lambda_rate, {}),
+    }
+    for name, (build, compiled_cache) in cases.items():
+        best = min(timeit.repeat(lambda: execute_prepare(build, compiled_cache), number=rounds, repeat=5)) / rounds
+        print(f'{name:<32} {best * 1e6:8.1f} us/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Size and CPU time of a GET /cargos/ body per gzip level and brotli quality, to pick COMPRESSION_GZIP_LEVEL and
+COMPRESSION_BROTLI_QUALITY.
+
+    python -m benchmarks.compression_levels [tariffs] [rounds]
+"""
+import sys
+import timeit
+import uuid
+from datetime import date, datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from cargoapi.schemas.cargos import CargoTariffResponse
+from cargoapi.utils.compression import BROTLI, GZIP, ResponseCompressor
+
+tariffs_adapter = TypeAdapter(list[CargoTariffResponse])
+
+
+def make_body(count: int) -> bytes:
+    cargo_type_uids = [uuid.uuid4() for _ in range(10)]
+    created_at = datetime(2024, 1, 1, 12, 0)
+    return tariffs_adapter.dump_json(
+        [
+            CargoTariffResponse(
+                uid=uuid.uuid4(),
+                tariff_date=date(2020, 1, 1) + timedelta(days=i // 10),
+                rate=0.01 + (i % 97) / 1000,
+                to_cargo_type_uid=cargo_type_uids[i % 10],
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            for i in range(count)
+        ],
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    body = make_body(count)
+    compressor = ResponseCompressor(minimum_size=0, gzip_level=1, brotli_quality=0)
+    print(f'{count} tariffs, {len(body)} B')
+
+    cases = [(GZIP, level) for level in range(1, 10)]
+    if BROTLI in compressor.encodings:
+        cases += [(BROTLI, quality) for quality in range(0, 12)]
+    for encoding, level in cases:
+        compressor.gzip_level = compressor.brotli_quality = level
+        size = len(compressor.compress(body, encoding))
+        best = min(timeit.repeat(lambda: compressor.compress(body, encoding), number=rounds, repeat=3)) / rounds
+        print(f'{encoding:<4} {level:>2} {size:10} B {len(body) / size:6.1f}x {best * 1e3:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
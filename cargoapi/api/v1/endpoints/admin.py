@@ -0,0 +1,43 @@
+import hmac
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+
+from cargoapi.core.config import settings
+from cargoapi.utils.exceptions import ApiExceptionsError
+from cargoapi.utils.profiler import profile_store, render_folded
+
+router = APIRouter(
+    prefix='/admin',
+    tags=['admin'],
+)
+
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not settings.PROFILING_ENABLED:
+        raise ApiExceptionsError.not_found_404()
+    if not settings.PROFILING_ADMIN_TOKEN or not x_admin_token:
+        raise ApiExceptionsError.forbidden_403()
+    if not hmac.compare_digest(x_admin_token.encode('utf-8'), settings.PROFILING_ADMIN_TOKEN.encode('utf-8')):
+        raise ApiExceptionsError.forbidden_403()
+
+
+# /api/v1/admin/profiles/ - Список снятых профилей запросов
+@router.get('/profiles', description='Список профилей запросов', dependencies=[Depends(verify_admin_token)])
+async def list_profiles() -> list[dict[str, Any]]:
+    return profile_store.summaries()
+
+
+# /api/v1/admin/profiles/<id>/ - Профиль в формате folded stacks (flamegraph.pl, speedscope)
+@router.get(
+    '/profiles/{profile_id}',
+    response_class=PlainTextResponse,
+    description='Профиль запроса в формате folded stacks',
+    dependencies=[Depends(verify_admin_token)],
+)
+async def get_profile(profile_id: str) -> str:
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise ApiExceptionsError.not_found_404(detail='Profile not found')
+    return render_folded(profile['folded'])
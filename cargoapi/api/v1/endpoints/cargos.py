@@ -1,37 +1,124 @@
 import collections
 import datetime
-import json
+import logging
 import uuid
 from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+import pydantic_core
+from fastapi import APIRouter, Depends, File, Header, Query, Request, Response, UploadFile, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from cargoapi.core.config import settings
 from cargoapi.database import get_session
 from cargoapi.models.api.v1.cargos import CargoTariff
-from cargoapi.schemas.cargos import CargoCalculateRate, CargoTariffResponse, CargoTariffUpdate
+from cargoapi.schemas.cargos import (
+    CargoCalculateQuery,
+    CargoCalculateRate,
+    CargoTariffResponse,
+    CargoTariffUpdate,
+)
 from cargoapi.services.cargos_service import CargoService
 from cargoapi.services.users_service import UserService
+from cargoapi.utils import binary_protocol
+from cargoapi.utils.cache import TTLCache
+from cargoapi.utils.changes import tariff_change_hub
+from cargoapi.utils.compression import PrecompressedBody, response_compressor
 from cargoapi.utils.exceptions import ApiExceptionsError
+from cargoapi.utils.kafka_tools import KafkaUnavailableError, kafka_producer
+from cargoapi.utils.tariff_validation import validate_cargo_tariffs
 
 router = APIRouter(
     prefix='/cargos',
     tags=['cargo'],
 )
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='token')
+logger = logging.getLogger(__name__)
 cargo_service = CargoService()
 user_service = UserService()
+cargos_response_cache: TTLCache[PrecompressedBody] = TTLCache(
+    ttl=settings.CARGOS_RESPONSE_CACHE_TTL_SECONDS,
+    max_size=settings.CARGOS_RESPONSE_CACHE_MAX_SIZE,
+)
+_cargo_tariffs_adapter = TypeAdapter(list[CargoTariffResponse])
+
+
+async def _send_tariff_event(user_uid: uuid.UUID, action: str) -> None:
+    """
+    Report a tariff change to Kafka, after the change is already committed.
+
+    A failed send never fails the request, its change has been saved: while Kafka is unreachable (still
+    connecting or the circuit breaker is open) the event is dropped with a warning, other send errors
+    (timeouts, broker errors) are already counted by the breaker and only logged.
+    """
+    try:
+        await kafka_producer.send_message(
+            settings.KAFKA_TOPIC,
+            {
+                'message': {
+                    'user_uid': str(user_uid),
+                    'action': action,
+                    'timestamp': str(datetime.datetime.now()),
+                },
+            },
+        )
+    except KafkaUnavailableError as e:
+        logger.warning('Tariff %s event of user %s was not sent: %s', action, user_uid, e)
+    except Exception:  # noqa: B902
+        logger.exception('Tariff %s event of user %s was not sent', action, user_uid)
 
 
 # /api/v1/cargos/ - Получение всех тарифов страхования
 @router.get('/', response_model=list[CargoTariffResponse], description='Получение всех тарифов страхования')
 async def get_all_cargos(
+    request: Request,
+    date_from: Optional[datetime.date] = Query(None, description='Тарифы с даты (включительно)'),
+    date_to: Optional[datetime.date] = Query(None, description='Тарифы по дату (включительно)'),
     session: AsyncSession = Depends(get_session),
-) -> collections.abc.Sequence[Any]:
-    cargos_tariff = await cargo_service.get_all_cargos_tariff(session)
-    return cargos_tariff
+) -> Response:
+    # The version is read before the query: a change committed after it only bumps the version for the next request
+    cache_key = (tariff_change_hub.version, date_from, date_to)
+    cargos_body = cargos_response_cache.get(cache_key)
+    if cargos_body is None:
+        cargos_tariff = await cargo_service.get_all_cargos_tariff(session, date_from, date_to)
+        cargo_tariffs = _cargo_tariffs_adapter.validate_python(cargos_tariff, from_attributes=True)
+        cargos_body = PrecompressedBody(_cargo_tariffs_adapter.dump_json(cargo_tariffs))
+        cargos_response_cache.set(cache_key, cargos_body)
+    # COMPRESSION_ENABLED covers this response too, not only the middleware
+    accepted_encoding = (
+        response_compressor.negotiate(request.headers.get('accept-encoding')) if settings.COMPRESSION_ENABLED else None
+    )
+    content, encoding = cargos_body.get(response_compressor, accepted_encoding)
+    headers = {'Vary': 'Accept-Encoding'}
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(content=content, media_type='application/json', headers=headers)
+
+
+# /api/v1/cargos/changes/ - Поток изменений тарифов (server-sent events)
+@router.get(
+    '/changes',
+    response_class=StreamingResponse,
+    description=(
+        'Поток изменений тарифов (SSE), возобновляется с Last-Event-ID. Доставляются только изменения, '
+        'сделанные через тот же процесс (worker) сервера, что и подписка'
+    ),
+)
+async def stream_cargo_changes(
+    last_event_id: Optional[str] = Query(default=None),
+    last_event_id_header: Optional[str] = Header(default=None, alias='Last-Event-ID'),
+) -> StreamingResponse:
+    return StreamingResponse(
+        tariff_change_hub.stream(
+            last_event_id_header or last_event_id,
+            heartbeat=settings.TARIFF_CHANGES_HEARTBEAT_SECONDS,
+        ),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
 # /api/v1/cargos/<uuid:UUID>/ - Получение подробной информации о тарифе
@@ -67,21 +154,7 @@ async def update_cargo(
         raise ApiExceptionsError.not_found_404(detail='Cargo tariff not found')
 
     updated_cargo_tariff = await cargo_service.update_cargo_tariff(cargo_uid, cargo_update_data, session)
-    try:
-        from cargoapi.utils.kafka_tools import kafka_producer
-
-        await kafka_producer.send_message(
-            settings.KAFKA_TOPIC,
-            {
-                'message': {
-                    'user_uid': str(current_user_uid),
-                    'action': 'UPDATE',
-                    'timestamp': str(datetime.datetime.now()),
-                },
-            },
-        )
-    except Exception as e:  # noqa: B902
-        raise HTTPException(status_code=500, detail=f'Error sending message: {str(e)}')
+    await _send_tariff_event(current_user_uid, 'UPDATE')
 
     return updated_cargo_tariff
 
@@ -102,21 +175,7 @@ async def delete_cargo(
         raise ApiExceptionsError.not_found_404(detail='Cargo tariff not found')
 
     await cargo_service.delete_cargo_tariff(cargo_uid, session)
-    try:
-        from cargoapi.utils.kafka_tools import kafka_producer
-
-        await kafka_producer.send_message(
-            settings.KAFKA_TOPIC,
-            {
-                'message': {
-                    'user_uid': str(current_user_uid),
-                    'action': 'DELETE',
-                    'timestamp': str(datetime.datetime.now()),
-                },
-            },
-        )
-    except Exception as e:  # noqa: B902
-        raise HTTPException(status_code=500, detail=f'Error sending message: {str(e)}')
+    await _send_tariff_event(current_user_uid, 'DELETE')
     return {
         'detail': 'Cargo tariff deleted successfully.',
         'error': None,
@@ -129,9 +188,18 @@ async def delete_cargo(
 async def load_cargos(
     upload_file: UploadFile = File(...),
     session: AsyncSession = Depends(get_session),
-) -> dict[str, Any]:
-    cargo_tariffs_json_data = json.load(upload_file.file)
-    cargo_tariff_upload_result = await cargo_service.upload_json_cargo_tariffs(cargo_tariffs_json_data, session)
+) -> Any:
+    validation_report = await validate_cargo_tariffs(await upload_file.read())
+    if validation_report.error_count:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content={
+                'detail': 'Cargo tariffs file has invalid rows, nothing was uploaded.',
+                'error_count': validation_report.error_count,
+                'errors': validation_report.errors,
+            },
+        )
+    cargo_tariff_upload_result = await cargo_service.upload_json_cargo_tariffs(validation_report.rows, session)
     if not cargo_tariff_upload_result:
         return {
             'detail': 'Upload was failed.',
@@ -145,21 +213,106 @@ async def load_cargos(
     }
 
 
+_calculate_batch_adapter = TypeAdapter(list[CargoCalculateRate])
+
+
+def _calculate_openapi_body(schema: dict[str, Any]) -> dict[str, Any]:
+    return {
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/json': {'schema': schema},
+                binary_protocol.CALCULATE_CONTENT_TYPE: {'schema': {'type': 'string', 'format': 'binary'}},
+            },
+        },
+    }
+
+
+async def _read_calculate_items(request: Request, batch: bool) -> collections.abc.Sequence[CargoCalculateQuery]:
+    """
+    Parse the calculate body, JSON or the binary frame depending on Content-Type.
+    """
+    body = await request.body()
+    if binary_protocol.is_binary_content_type(request.headers.get('content-type')):
+        try:
+            items = binary_protocol.decode_calculate_request(body, max_items=settings.CALCULATE_BATCH_MAX_SIZE)
+        except binary_protocol.BinaryFrameError as e:
+            raise ApiExceptionsError.bad_request_400(detail=str(e))
+        if not batch and len(items) != 1:
+            raise ApiExceptionsError.bad_request_400(detail='Expected exactly one item in frame')
+        return items
+    try:
+        if not batch:
+            return [CargoCalculateRate.model_validate_json(body)]
+        # Parse first so an oversized batch is rejected before any item is validated
+        try:
+            raw_items = pydantic_core.from_json(body)
+        except ValueError as e:
+            raise RequestValidationError(
+                [{'type': 'json_invalid', 'loc': ('body', 0), 'msg': 'JSON decode error', 'ctx': {'error': str(e)}}],
+            )
+        if isinstance(raw_items, list) and len(raw_items) > settings.CALCULATE_BATCH_MAX_SIZE:
+            raise ApiExceptionsError.bad_request_400(detail=f'Too many items: max {settings.CALCULATE_BATCH_MAX_SIZE}')
+        return _calculate_batch_adapter.validate_python(raw_items)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, 'loc': ('body', *error['loc'])} for error in e.errors()])
+
+
 # /api/v1/cargos/calculate/ - Расчет стоимости страхования по заданным данным
-@router.post('/calculate', description='Загрузка тарифов')
+@router.post(
+    '/calculate',
+    description=f'Расчет стоимости страхования (JSON или {binary_protocol.CALCULATE_CONTENT_TYPE})',
+    openapi_extra=_calculate_openapi_body(CargoCalculateRate.model_json_schema()),
+)
 async def calculate_cargos(
-    cargo_calculate_data: CargoCalculateRate,
+    request: Request,
     session: AsyncSession = Depends(get_session),
-) -> dict[str, Any]:
-    cargo_tariff = await cargo_service.get_cargo_tariff_by_date_and_type(cargo_calculate_data, session)
-    if not cargo_tariff:
+) -> Any:
+    [cargo_calculate_data] = await _read_calculate_items(request, batch=False)
+    cargo_rate = await cargo_service.get_cargo_rate_by_date_and_type(cargo_calculate_data, session)
+    if cargo_rate is None:
         raise ApiExceptionsError.not_found_404(detail='Cargo tariff was not found')
     cargo_calculate_result = await cargo_service.calculate_summary_cargo_price(
-        cargo_tariff.rate,
+        cargo_rate,
         cargo_calculate_data.total_price,
     )
+    if binary_protocol.accepts_binary(request.headers.get('accept')):
+        return Response(
+            content=binary_protocol.encode_calculate_response([cargo_calculate_result]),
+            media_type=binary_protocol.CALCULATE_CONTENT_TYPE,
+        )
     return {
         'detail': 'Cargo tariffs was successfully calculated.',
         'error': None,
         'result': cargo_calculate_result,
     }
+
+
+# /api/v1/cargos/calculate/batch/ - Расчет стоимости страхования для списка запросов
+@router.post(
+    '/calculate/batch',
+    description=f'Пакетный расчет стоимости страхования (JSON или {binary_protocol.CALCULATE_CONTENT_TYPE})',
+    openapi_extra=_calculate_openapi_body({'type': 'array', 'items': CargoCalculateRate.model_json_schema()}),
+)
+async def calculate_cargos_batch(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    cargo_calculate_items = await _read_calculate_items(request, batch=True)
+    cargo_rates = await cargo_service.get_cargo_rates_by_dates_and_types(cargo_calculate_items, session)
+    cargo_calculate_results: list[Optional[float]] = []
+    for item in cargo_calculate_items:
+        rate = cargo_rates.get((item.tariff_date, item.cargo_type_name))
+        cargo_calculate_results.append(
+            None if rate is None else await cargo_service.calculate_summary_cargo_price(rate, item.total_price),
+        )
+    if binary_protocol.accepts_binary(request.headers.get('accept')):
+        return Response(
+            content=binary_protocol.encode_calculate_response(cargo_calculate_results),
+            media_type=binary_protocol.CALCULATE_CONTENT_TYPE,
+        )
+    return {
+        'detail': 'Cargo tariffs was successfully calculated.',
+        'error': None,
+        'result': cargo_calculate_results,
+    }
@@ -0,0 +1,35 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from cargoapi.database import ping_db
+from cargoapi.utils.admission import admission_controller
+from cargoapi.utils.changes import tariff_change_hub
+from cargoapi.utils.exceptions import ApiExceptionsError
+from cargoapi.utils.kafka_tools import kafka_producer
+
+router = APIRouter(
+    prefix='/health',
+    tags=['health'],
+)
+
+
+# /api/v1/health/live - Процесс запущен и обслуживает запросы
+@router.get('/live', description='Liveness probe')
+async def liveness() -> dict[str, Any]:
+    return {'status': 'ok'}
+
+
+# /api/v1/health/ready - Готовность принимать трафик
+@router.get('/ready', description='Readiness probe')
+async def readiness() -> dict[str, Any]:
+    # Kafka is connected lazily and guarded by a circuit breaker, so it does not gate readiness
+    if not await ping_db():
+        raise ApiExceptionsError.service_unavailable_503(detail='Database is not available')
+    return {'status': 'ok', 'database': 'ok', 'kafka': kafka_producer.state}
+
+
+# /api/v1/health/admission - Метрики admission control: очереди и отброшенные запросы
+@router.get('/admission', description='Admission control metrics')
+async def admission_metrics() -> dict[str, Any]:
+    return {**admission_controller.stats(), 'tariff_changes_subscribers': tariff_change_hub.subscribers}
@@ -15,6 +15,11 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = Field(alias='POSTGRES_PORT', default=5432)
     POSTGRES_PASSWORD: str = Field(alias='POSTGRES_PASSWORD')
     POSTGRES_DB: str = Field(alias='POSTGRES_DB')
+    DB_ECHO: bool = Field(alias='DB_ECHO', default=True)
+    # SQLAlchemy compiled statement cache (per engine) and asyncpg prepared statement cache (per connection),
+    # 0 disables the latter, e.g. behind pgbouncer in transaction pooling mode
+    DB_QUERY_CACHE_SIZE: int = Field(alias='DB_QUERY_CACHE_SIZE', default=500)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = Field(alias='DB_PREPARED_STATEMENT_CACHE_SIZE', default=100)
 
     SECRET_KEY: str = Field(alias='SECRET_KEY')
     REFERSH_SECRET_KEY: str = Field(alias='REFERSH_SECRET_KEY')
@@ -22,11 +27,67 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(alias='ACCESS_TOKEN_EXPIRE_MINUTES')
     REFRESH_TOKEN_EXPIRE_MINUTES: int = Field(alias='REFRESH_TOKEN_EXPIRE_MINUTES')
 
+    USER_CACHE_TTL_SECONDS: float = Field(alias='USER_CACHE_TTL_SECONDS', default=30.0)
+    USER_CACHE_MAX_SIZE: int = Field(alias='USER_CACHE_MAX_SIZE', default=10000)
+
+    # Admission control, see cargoapi/utils/admission.py and admission_routes in cargoapi/router.py
+    ADMISSION_CONTROL_ENABLED: bool = Field(alias='ADMISSION_CONTROL_ENABLED', default=True)
+    ADMISSION_CRITICAL_CONCURRENCY: int = Field(alias='ADMISSION_CRITICAL_CONCURRENCY', default=100)
+    ADMISSION_CRITICAL_QUEUE_SIZE: int = Field(alias='ADMISSION_CRITICAL_QUEUE_SIZE', default=200)
+    ADMISSION_AUTH_CONCURRENCY: int = Field(alias='ADMISSION_AUTH_CONCURRENCY', default=4)
+    ADMISSION_AUTH_QUEUE_SIZE: int = Field(alias='ADMISSION_AUTH_QUEUE_SIZE', default=16)
+    ADMISSION_BULK_CONCURRENCY: int = Field(alias='ADMISSION_BULK_CONCURRENCY', default=1)
+    ADMISSION_BULK_QUEUE_SIZE: int = Field(alias='ADMISSION_BULK_QUEUE_SIZE', default=2)
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = Field(alias='ADMISSION_QUEUE_TIMEOUT_SECONDS', default=2.0)
+    ADMISSION_RETRY_AFTER_SECONDS: int = Field(alias='ADMISSION_RETRY_AFTER_SECONDS', default=1)
+
+    # `python -m cargoapi.utils.partitions archive` detaches the yearly partitions of cargo_tariffs older than the last
+    # TARIFF_PARTITION_KEEP_YEARS years, 0 keeps everything attached
+    TARIFF_PARTITION_KEEP_YEARS: int = Field(alias='TARIFF_PARTITION_KEEP_YEARS', default=0)
+
+    # The binary calculate frames carry the item count as uint16
+    CALCULATE_BATCH_MAX_SIZE: int = Field(alias='CALCULATE_BATCH_MAX_SIZE', default=1000, ge=1, le=65535)
+
+    # Upload validation, 0 workers means one per CPU
+    TARIFF_VALIDATION_WORKERS: int = Field(alias='TARIFF_VALIDATION_WORKERS', default=0)
+    TARIFF_VALIDATION_PARALLEL_THRESHOLD_BYTES: int = Field(
+        alias='TARIFF_VALIDATION_PARALLEL_THRESHOLD_BYTES',
+        default=8 * 1024 * 1024,
+    )
+    TARIFF_VALIDATION_MAX_ERRORS: int = Field(alias='TARIFF_VALIDATION_MAX_ERRORS', default=1000)
+
+    TARIFF_CHANGES_HISTORY_SIZE: int = Field(alias='TARIFF_CHANGES_HISTORY_SIZE', default=1000)
+    TARIFF_CHANGES_HEARTBEAT_SECONDS: float = Field(alias='TARIFF_CHANGES_HEARTBEAT_SECONDS', default=15.0)
+
+    # Response compression, brotli is used when the optional `brotli` package is installed. The levels trade
+    # ratio for CPU time, the maximums (9 and 11) cost several times more CPU per response
+    COMPRESSION_ENABLED: bool = Field(alias='COMPRESSION_ENABLED', default=True)
+    COMPRESSION_MINIMUM_SIZE: int = Field(alias='COMPRESSION_MINIMUM_SIZE', default=1024)
+    COMPRESSION_GZIP_LEVEL: int = Field(alias='COMPRESSION_GZIP_LEVEL', default=4)
+    COMPRESSION_BROTLI_QUALITY: int = Field(alias='COMPRESSION_BROTLI_QUALITY', default=4)
+    # Serialized and compressed GET /cargos/ bodies, keyed on the tariff version of this process. The TTL bounds
+    # how long changes made through other worker processes may go unseen
+    CARGOS_RESPONSE_CACHE_TTL_SECONDS: float = Field(alias='CARGOS_RESPONSE_CACHE_TTL_SECONDS', default=5.0)
+    CARGOS_RESPONSE_CACHE_MAX_SIZE: int = Field(alias='CARGOS_RESPONSE_CACHE_MAX_SIZE', default=16)
+
+    # On-demand sampling profiler, the middleware is not installed at all unless enabled
+    PROFILING_ENABLED: bool = Field(alias='PROFILING_ENABLED', default=False)
+    PROFILING_ADMIN_TOKEN: str = Field(alias='PROFILING_ADMIN_TOKEN', default='')
+    PROFILING_SAMPLE_RATE: float = Field(alias='PROFILING_SAMPLE_RATE', default=0.0)
+    PROFILING_INTERVAL_SECONDS: float = Field(alias='PROFILING_INTERVAL_SECONDS', default=0.005)
+    PROFILING_MAX_SECONDS: float = Field(alias='PROFILING_MAX_SECONDS', default=30.0)
+    PROFILING_HISTORY_SIZE: int = Field(alias='PROFILING_HISTORY_SIZE', default=20)
+
     CELERY_HOST: str = Field(alias='CELERY_HOST')
     CELERY_PORT: str = Field(alias='CELERY_PORT')
 
     KAFKA_BOOTSTRAP_SERVERS: str = Field(alias='KAFKA_BOOTSTRAP_SERVERS')
     KAFKA_TOPIC: str = Field(alias='KAFKA_TOPIC')
+    KAFKA_CONNECT_TIMEOUT_SECONDS: float = Field(alias='KAFKA_CONNECT_TIMEOUT_SECONDS', default=5.0)
+    KAFKA_SEND_TIMEOUT_SECONDS: float = Field(alias='KAFKA_SEND_TIMEOUT_SECONDS', default=5.0)
+    KAFKA_CONNECT_RETRY_SECONDS: float = Field(alias='KAFKA_CONNECT_RETRY_SECONDS', default=1.0)
+    KAFKA_BREAKER_FAILURE_THRESHOLD: int = Field(alias='KAFKA_BREAKER_FAILURE_THRESHOLD', default=3)
+    KAFKA_BREAKER_RESET_SECONDS: float = Field(alias='KAFKA_BREAKER_RESET_SECONDS', default=30.0)
 
     class Config:
         env_file = os.path.join(BASE_DIR, '.env')
@@ -1,32 +1,40 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel
 
-from cargoapi.core.config import get_db_url
+from cargoapi.core.config import get_db_url, settings
 
-DATABASE_URL = get_db_url()
+DATABASE_URL = f'{get_db_url()}?prepared_statement_cache_size={settings.DB_PREPARED_STATEMENT_CACHE_SIZE}'
 
 async_engine = AsyncEngine(
     create_engine(
         url=DATABASE_URL,
-        echo=True,
+        echo=settings.DB_ECHO,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
     ),
 )
 
+Session = sessionmaker(  # type:ignore[call-overload]
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
-async def init_db() -> None:
-    async with async_engine.begin() as conn:
-        # await conn.run_sync(SQLModel.metadata.drop_all)
-        await conn.run_sync(SQLModel.metadata.create_all)
 
+async def ping_db() -> bool:
+    """
+    Check that the database accepts connections.
 
-async def get_session() -> AsyncSession:  # type:ignore[misc]
-    Session = sessionmaker(  # type:ignore[call-overload]
-        bind=async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
+    The schema itself is managed by the alembic migrations (`make migrate`), not on startup.
+    """
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+    except Exception:  # noqa: B902
+        return False
+    return True
 
+
+async def get_session() -> AsyncSession:  # type:ignore[misc]
     async with Session() as session:
         yield session
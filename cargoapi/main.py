@@ -1,9 +1,12 @@
-import asyncio
-
 from fastapi import FastAPI
 
-from cargoapi.database import init_db
-from cargoapi.router import api_router_v1
+from cargoapi.core.config import settings
+from cargoapi.router import api_router_v1, classify_admission, streaming_prefixes
+from cargoapi.utils.admission import AdmissionControlMiddleware, admission_controller
+from cargoapi.utils.compression import CompressionMiddleware, response_compressor
+from cargoapi.utils.kafka_tools import kafka_producer
+from cargoapi.utils.profiler import ProfilingMiddleware, profile_store
+from cargoapi.utils.tariff_validation import shutdown_process_pool
 
 app = FastAPI(
     docs_url='/api/openapi',
@@ -13,19 +16,40 @@ app = FastAPI(
 
 app.include_router(api_router_v1)
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        compressor=response_compressor,
+        exclude_media_types=('text/event-stream',),
+    )
+
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=admission_controller,
+        classify=classify_admission,
+    )
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        token=settings.PROFILING_ADMIN_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval=settings.PROFILING_INTERVAL_SECONDS,
+        max_seconds=settings.PROFILING_MAX_SECONDS,
+        exclude_prefixes=streaming_prefixes,
+    )
+
 
 @app.on_event('startup')
 async def startup_event() -> None:
-    from cargoapi.utils.kafka_tools import kafka_producer
-
-    await init_db()
-    asyncio.get_event_loop()
-    await kafka_producer.start()
+    """Connect to Kafka in the background, the schema is applied by `alembic upgrade head`."""
+    kafka_producer.start_in_background()
 
 
 @app.on_event('shutdown')
 async def shutdown_event() -> None:
-    from cargoapi.utils.kafka_tools import kafka_producer
-
-    """Shutdown Kafka producer when the application stops."""
+    """Shutdown Kafka producer and the validation process pool when the application stops."""
     await kafka_producer.stop()
+    shutdown_process_pool()
@@ -0,0 +1,57 @@
+"""Initial schema, matches the tables previously created by metadata.create_all on startup
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00
+
+Databases created before migrations were introduced already have these tables,
+mark them with `alembic stamp 0001` and then run `alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as pg
+from alembic import op
+
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cargo_types',
+        sa.Column('uid', pg.UUID(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('created_at', pg.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', pg.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('uid'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_table(
+        'cargo_tariffs',
+        sa.Column('uid', pg.UUID(), nullable=False),
+        sa.Column('tariff_date', sa.Date(), nullable=False),
+        sa.Column('rate', sa.Float(), nullable=False),
+        sa.Column('to_cargo_type_uid', pg.UUID(), nullable=False),
+        sa.Column('created_at', pg.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', pg.TIMESTAMP(), nullable=True),
+        sa.ForeignKeyConstraint(['to_cargo_type_uid'], ['cargo_types.uid']),
+        sa.PrimaryKeyConstraint('uid'),
+    )
+    op.create_table(
+        'user',
+        sa.Column('uid', pg.UUID(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.Column('created_at', pg.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', pg.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('uid'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user')
+    op.drop_table('cargo_tariffs')
+    op.drop_table('cargo_types')
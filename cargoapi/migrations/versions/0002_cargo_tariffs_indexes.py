@@ -0,0 +1,31 @@
+"""Indexes and unique constraint for cargo_tariffs lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:05:00
+
+/cargos/calculate and the tariffs upload look tariffs up by (cargo type, date),
+the unique constraint backs these lookups with an index and forbids duplicate rates for a day.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_unique_constraint(
+        'uq_cargo_tariffs_cargo_type_date',
+        'cargo_tariffs',
+        ['to_cargo_type_uid', 'tariff_date'],
+    )
+    op.create_index('ix_cargo_tariffs_tariff_date', 'cargo_tariffs', ['tariff_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cargo_tariffs_tariff_date', table_name='cargo_tariffs')
+    op.drop_constraint('uq_cargo_tariffs_cargo_type_date', 'cargo_tariffs', type_='unique')
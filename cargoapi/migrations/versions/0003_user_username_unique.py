@@ -0,0 +1,25 @@
+"""Unique username
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00
+
+Registration and login look users up by username, the unique constraint indexes the column
+and lets registration rely on the database instead of a check-then-insert race.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_unique_constraint('uq_user_username', 'user', ['username'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_username', 'user', type_='unique')
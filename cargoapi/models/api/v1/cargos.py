@@ -2,7 +2,7 @@ import uuid
 from datetime import date, datetime
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import Column, Date, Float, ForeignKey, String
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, String, UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -34,6 +34,12 @@ class CargoType(SQLModel, table=True):
 
 class CargoTariff(SQLModel, table=True):
     __tablename__ = 'cargo_tariffs'
+    # Non-partitioned layout, `python -m cargoapi.utils.partitions enable` partitions the table by year,
+    # the primary key becomes (uid, tariff_date) and the tariff_date index a BRIN one
+    __table_args__ = (
+        UniqueConstraint('to_cargo_type_uid', 'tariff_date', name='uq_cargo_tariffs_cargo_type_date'),
+        Index('ix_cargo_tariffs_tariff_date', 'tariff_date'),
+    )
 
     uid: uuid.UUID = Field(
         sa_column=Column(
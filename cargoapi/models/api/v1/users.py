@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import Column
+from sqlalchemy import Column, String
 from sqlmodel import Field, SQLModel
 
 
@@ -17,7 +17,13 @@ class User(SQLModel, table=True):
             default=uuid.uuid4,
         ),
     )
-    username: str
+    username: str = Field(
+        sa_column=Column(
+            String,
+            nullable=False,
+            unique=True,
+        ),
+    )
     password: str
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
@@ -1,10 +1,14 @@
+from typing import Optional
+
 from fastapi import APIRouter
 
-from cargoapi.api.v1.endpoints import auth, cargos, users
+from cargoapi.api.v1.endpoints import admin, auth, cargos, health, users
 
 api_router_v1 = APIRouter()
 
 _v1_routers = [
+    health,
+    admin,
     users,
     auth,
     cargos,
@@ -15,3 +19,19 @@ for v1_route in _v1_routers:
         v1_route.router,
         prefix='/api/v1',
     )
+
+# Admission pools (cargoapi/utils/admission.py) of the expensive routes, everything else is 'critical'
+admission_routes = {
+    ('POST', '/api/v1/cargos/load'): 'bulk',
+    ('POST', '/api/v1/auth/login'): 'auth',
+    ('POST', '/api/v1/users/create'): 'auth',
+}
+# Long-lived streams, they would hold an admission slot and a profiler for their whole lifetime
+streaming_prefixes = ('/api/v1/cargos/changes',)
+admission_exempt_prefixes = ('/api/v1/health', *streaming_prefixes)
+
+
+def classify_admission(method: str, path: str) -> Optional[str]:
+    if path.startswith(admission_exempt_prefixes):
+        return None
+    return admission_routes.get((method, path.rstrip('/')), 'critical')
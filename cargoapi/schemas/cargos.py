@@ -1,5 +1,6 @@
 import uuid
 from datetime import date, datetime
+from typing import NamedTuple, Union
 
 from pydantic import BaseModel
 
@@ -26,5 +27,18 @@ class CargoCalculateRate(BaseModel):
     total_price: int
 
 
+class CargoCalculateItem(NamedTuple):
+    """
+    CargoCalculateRate decoded from the binary protocol, built without pydantic validation.
+    """
+
+    tariff_date: date
+    cargo_type_name: str
+    total_price: int
+
+
+CargoCalculateQuery = Union[CargoCalculateRate, CargoCalculateItem]
+
+
 class CargoTariffUpdate(BaseModel):
     rate: float
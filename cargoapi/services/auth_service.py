@@ -1,21 +1,22 @@
 from typing import Optional
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import lambda_stmt
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from cargoapi.models.api.v1.users import User
 from cargoapi.schemas.auth import Login
-from cargoapi.utils.password_hash import hash_password, verify_password
+from cargoapi.utils.password_hash import verify_password
 
 
 class AuthService:
     async def get_user_by_credentials(self, login_data: Login, session: AsyncSession) -> Optional[User]:
-        user = None
-        hashed_password = hash_password(login_data.password)
-        if verify_password(login_data.password, hashed_password):
-            statement = select(User).where(
-                User.username == login_data.username,
-            )
-            result = await session.execute(statement)
-            user = result.scalars().first()
-        return user if user else None
+        username = login_data.username
+        statement = lambda_stmt(lambda: select(User).where(User.username == username))
+        result = await session.execute(statement)
+        user = result.scalars().first()
+        # bcrypt is CPU bound, keep it off the event loop
+        if user and await run_in_threadpool(verify_password, login_data.password, user.password):
+            return user
+        return None
@@ -1,14 +1,18 @@
 import collections
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any, Optional
 
+from sqlalchemy import lambda_stmt, tuple_
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 
 from cargoapi.models.api.v1.cargos import CargoTariff, CargoType
-from cargoapi.schemas.cargos import CargoCalculateRate, CargoTariffUpdate
+from cargoapi.schemas.cargos import CargoCalculateQuery, CargoTariffUpdate
+from cargoapi.utils.changes import tariff_change_hub
 from cargoapi.utils.exceptions import ApiExceptionsError
+from cargoapi.utils.partitions import ensure_tariff_partitions
+from cargoapi.utils.tariff_validation import TariffRows
 
 
 class CargoService:
@@ -16,8 +20,19 @@ class CargoService:
     async def get_all_cargos_tariff(
         cls,
         session: AsyncSession,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
     ) -> collections.abc.Sequence[CargoTariff]:
+        """
+        Tariffs, optionally limited to tariff dates in [date_from, date_to].
+
+        The bounds are plain comparisons on tariff_date, so a partitioned cargo_tariffs only scans the matching years.
+        """
         statement = select(CargoTariff)
+        if date_from is not None:
+            statement = statement.where(CargoTariff.tariff_date >= date_from)
+        if date_to is not None:
+            statement = statement.where(CargoTariff.tariff_date <= date_to)
         result = await session.execute(statement)
         return result.scalars().all()
 
@@ -27,26 +42,54 @@ class CargoService:
         cargo_uid: uuid.UUID,
         session: AsyncSession,
     ) -> Optional[CargoTariff]:
-        statement = select(CargoTariff).where(CargoTariff.uid == cargo_uid)
+        statement = lambda_stmt(lambda: select(CargoTariff).where(CargoTariff.uid == cargo_uid))
         result = await session.execute(statement)
         return result.scalars().one_or_none()
 
     @classmethod
-    async def get_cargo_tariff_by_date_and_type(
+    async def get_cargo_rate_by_date_and_type(
         cls,
-        new_cargo_tariffs: CargoCalculateRate,
+        cargo_calculate_data: CargoCalculateQuery,
         session: AsyncSession,
-    ) -> Optional[CargoTariff]:
+    ) -> Optional[float]:
+        """
+        Only the rate for /cargos/calculate, no ORM object is loaded.
+
+        Lambda statements are built and cache-keyed once per call site, the closure variables only become
+        bound parameters of the cached compiled statement.
+        """
+        tariff_date, cargo_type_name = cargo_calculate_data.tariff_date, cargo_calculate_data.cargo_type_name
+        statement = lambda_stmt(
+            lambda: select(CargoTariff.rate)
+            .join(CargoType, CargoTariff.to_cargo_type_uid == CargoType.uid)  # type: ignore[arg-type]
+            .where(CargoTariff.tariff_date == tariff_date, CargoType.name == cargo_type_name),
+        )
+        result = await session.execute(statement)
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def get_cargo_rates_by_dates_and_types(
+        cls,
+        cargo_calculate_items: collections.abc.Sequence[CargoCalculateQuery],
+        session: AsyncSession,
+    ) -> dict[tuple[date, str], float]:
+        """
+        Fetch the rates for a batch of (tariff date, cargo type name) pairs in one query.
+        """
+        keys = {(item.tariff_date, item.cargo_type_name) for item in cargo_calculate_items}
+        if not keys:
+            return {}
         statement = (
-            select(CargoTariff)
+            select(CargoTariff.tariff_date, CargoType.name, CargoTariff.rate)
             .join(CargoType, CargoTariff.to_cargo_type_uid == CargoType.uid)  # type: ignore[arg-type]
             .where(
-                CargoTariff.tariff_date == new_cargo_tariffs.tariff_date,
-                CargoType.name == new_cargo_tariffs.cargo_type_name,
+                # The planner does not prune partitions on the row comparison, the plain date list lets it
+                CargoTariff.tariff_date.in_({tariff_date for tariff_date, _ in keys}),  # type: ignore[attr-defined]
+                tuple_(CargoTariff.tariff_date, CargoType.name).in_(keys),
             )
         )
         result = await session.execute(statement)
-        return result.scalars().one_or_none()
+        return {(tariff_date, name): rate for tariff_date, name, rate in result.all()}
 
     @classmethod
     async def update_cargo_tariff(
@@ -63,6 +106,13 @@ class CargoService:
             session.add(cargo_tariff)
             await session.commit()
             await session.refresh(cargo_tariff)
+            tariff_change_hub.publish(
+                'update',
+                uid=cargo_tariff.uid,
+                tariff_date=cargo_tariff.tariff_date,
+                to_cargo_type_uid=cargo_tariff.to_cargo_type_uid,
+                rate=cargo_tariff.rate,
+            )
 
         return cargo_tariff
 
@@ -77,77 +127,99 @@ class CargoService:
             raise ApiExceptionsError.not_found_404(detail='Cargo tariff not found')
         await session.delete(cargo_tariff)
         await session.commit()
+        tariff_change_hub.publish(
+            'delete',
+            uid=cargo_tariff.uid,
+            tariff_date=cargo_tariff.tariff_date,
+            to_cargo_type_uid=cargo_tariff.to_cargo_type_uid,
+        )
 
     @classmethod
     async def upload_json_cargo_tariffs(
         cls,
-        new_cargo_tariffs_json: dict[str, Any],
+        new_cargo_tariffs: TariffRows,
         session: AsyncSession,
     ) -> Any:
         """
-        Uploads cargo tariffs from a JSON object, creating or updating CargoType and CargoTariff records.
+        Uploads validated cargo tariffs, creating or updating CargoType and CargoTariff records.
 
         Args:
-            new_cargo_tariffs_json (dict): JSON object containing cargo tariffs data.
+            new_cargo_tariffs (TariffRows): (tariff date, cargo type name, rate) rows from validate_cargo_tariffs.
             session (AsyncSession): Database session.
 
         Returns:
             dict: Summary of created and updated records.
         """
+        # Years and bounds from the ordinals column: only one date object per distinct day, not per row
+        tariff_ordinals = new_cargo_tariffs.date_ordinals
+        # Before the upload transaction: partitions are created in their own short transactions
+        archived_years = await ensure_tariff_partitions(
+            {date.fromordinal(ordinal).year for ordinal in set(tariff_ordinals)},
+        )
+        if archived_years:
+            raise ApiExceptionsError.unprocessable_entity_422(
+                detail=f'Tariffs of archived years {archived_years} can not be uploaded, nothing was uploaded.',
+            )
         try:
             created_types = 0
             updated_types = 0
             created_tariffs = 0
             updated_tariffs = 0
+            cargo_types: dict[str, CargoType] = {}
 
-            for date_str, tariffs in new_cargo_tariffs_json.items():
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-
-                for tariff in tariffs:
-                    cargo_type_name = tariff['cargo_type']
-                    rate = float(tariff['rate'])
-
+            for date_obj, cargo_type_name, rate in new_cargo_tariffs:
+                cargo_type = cargo_types.get(cargo_type_name)
+                if not cargo_type:
                     cargo_type_query = await session.execute(
                         select(CargoType).where(CargoType.name == cargo_type_name),
                     )
                     cargo_type = cargo_type_query.scalars().first()
 
-                    if not cargo_type:
-                        cargo_type = CargoType(name=cargo_type_name)
-                        session.add(cargo_type)
-                        await session.flush()
-                        created_types += 1
-                    else:
-                        updated_types += 1
-
-                    tariff_query = await session.execute(
-                        select(CargoTariff).where(
-                            CargoTariff.tariff_date == date_obj,
-                            CargoTariff.to_cargo_type_uid == cargo_type.uid,
-                        ),
+                if not cargo_type:
+                    cargo_type = CargoType(name=cargo_type_name)
+                    session.add(cargo_type)
+                    await session.flush()
+                    created_types += 1
+                else:
+                    updated_types += 1
+                cargo_types[cargo_type_name] = cargo_type
+
+                tariff_query = await session.execute(
+                    select(CargoTariff).where(
+                        CargoTariff.tariff_date == date_obj,
+                        CargoTariff.to_cargo_type_uid == cargo_type.uid,
+                    ),
+                )
+                existing_tariff = tariff_query.scalars().first()
+
+                if not existing_tariff:
+                    new_tariff = CargoTariff(
+                        tariff_date=date_obj,
+                        rate=rate,
+                        to_cargo_type_uid=cargo_type.uid,
                     )
-                    existing_tariff = tariff_query.scalars().first()
-
-                    if not existing_tariff:
-                        new_tariff = CargoTariff(
-                            tariff_date=date_obj,
-                            rate=rate,
-                            to_cargo_type_uid=cargo_type.uid,
-                        )
-                        session.add(new_tariff)
-                        created_tariffs += 1
-                    else:
-                        existing_tariff.rate = rate
-                        existing_tariff.updated_at = datetime.now()
-                        updated_tariffs += 1
+                    session.add(new_tariff)
+                    created_tariffs += 1
+                else:
+                    existing_tariff.rate = rate
+                    existing_tariff.updated_at = datetime.now()
+                    updated_tariffs += 1
 
             await session.commit()
-            return {
+            upload_result = {
                 'created_types': created_types,
                 'updated_types': updated_types,
                 'created_tariffs': created_tariffs,
                 'updated_tariffs': updated_tariffs,
             }
+            if tariff_ordinals:
+                tariff_change_hub.publish(
+                    'upload',
+                    date_from=date.fromordinal(min(tariff_ordinals)),
+                    date_to=date.fromordinal(max(tariff_ordinals)),
+                    **upload_result,
+                )
+            return upload_result
         except Exception as e:  # noqa: B902, F841
             await session.rollback()
             return None
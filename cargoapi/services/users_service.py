@@ -3,15 +3,24 @@ import uuid
 from typing import Any, Optional
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import Row
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Row, lambda_stmt
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from cargoapi.core.config import settings
 from cargoapi.models.api.v1.users import User
-from cargoapi.schemas.users import UserCreate
+from cargoapi.schemas.users import CurrentUser, UserCreate
 from cargoapi.utils.auth import JWTBearer, decodeJWT
+from cargoapi.utils.cache import TTLCache
 from cargoapi.utils.password_hash import hash_password
 
+user_profile_cache: TTLCache[CurrentUser] = TTLCache(
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
+
 
 class UserService:
     async def get_all_users(self, session: AsyncSession) -> collections.abc.Sequence[Row[tuple[User, Any]]]:
@@ -19,32 +28,40 @@ class UserService:
         result = await session.execute(statement)
         return result.all()
 
-    async def get_user_by_uid(self, user_uid: uuid.UUID, session: AsyncSession) -> Row[tuple[User, ...]]:
-        statement = select(User).where(User.uid == user_uid)
-        result = await session.execute(statement)
-        user = result.scalar_one()
-        return user if user is not None else None
-
-    async def get_user(self, username: str, session: AsyncSession) -> Optional[Row[tuple[User]]]:
-        statement = select(User).where(User.username == username)
-        result = await session.execute(statement)
-        user = result.first()
-        return user if user is not None else None
-
-    async def username_exists(self, username: str, session: AsyncSession) -> Optional[bool]:
-        statement = select(User).where(User.username == username)
+    async def get_user_profile(self, user_uid: uuid.UUID, session: AsyncSession) -> Optional[CurrentUser]:
+        """
+        Get user profile, cached for USER_CACHE_TTL_SECONDS by uid
+        """
+        cache_key = str(user_uid)
+        profile = user_profile_cache.get(cache_key)
+        if profile is not None:
+            return profile
+        statement = lambda_stmt(
+            lambda: select(User.uid, User.username, User.created_at).where(User.uid == user_uid),
+        )
         result = await session.execute(statement)
-        user = result.first()
-        return True if user else None
+        user = result.one_or_none()
+        if user is None:
+            return None
+        profile = CurrentUser.model_validate(user, from_attributes=True)
+        user_profile_cache.set(cache_key, profile)
+        return profile
 
     async def create_user(self, user_data: UserCreate, session: AsyncSession) -> Any:
-        hashed_password = hash_password(user_data.password)
+        """
+        Create user, returns None when the username is already taken (unique constraint on username)
+        """
+        hashed_password = await run_in_threadpool(hash_password, user_data.password)
         user_data.password = hashed_password
         user_data_dict = user_data.model_dump()
 
         new_user = User(**user_data_dict)
         session.add(new_user)
-        await session.commit()
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            return None
         return new_user
 
     async def get_current_user_uid(self, token: str = Depends(JWTBearer())) -> User:
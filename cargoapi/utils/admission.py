@@ -0,0 +1,176 @@
+import asyncio
+import collections
+import json
+from typing import Any, Callable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from cargoapi.core.config import settings
+
+
+class AdmissionPool:
+    """
+    Concurrency limit with a bounded FIFO queue for one class of requests.
+
+    Lower `priority` values are more important.
+    """
+
+    def __init__(self, name: str, priority: int, concurrency: int, queue_size: int):
+        self.name = name
+        self.priority = priority
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.waiters: collections.deque[asyncio.Future[None]] = collections.deque()
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'priority': self.priority,
+            'concurrency': self.concurrency,
+            'queue_size': self.queue_size,
+            'in_flight': self.in_flight,
+            'queue_depth': len(self.waiters),
+            'admitted': self.admitted,
+            'shed': self.shed,
+            'timed_out': self.timed_out,
+        }
+
+
+class AdmissionController:
+    def __init__(self, pools: list[AdmissionPool], queue_timeout: float, retry_after: int):
+        self.pools = {pool.name: pool for pool in pools}
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+    def _higher_priority_saturated(self, pool: AdmissionPool) -> bool:
+        return any(other.priority < pool.priority and other.waiters for other in self.pools.values())
+
+    async def acquire(self, pool: AdmissionPool) -> bool:
+        """
+        Take a slot in the pool, returns False when the request has to be shed.
+
+        Requests of a lower priority are shed right away while a more important pool is queueing.
+        """
+        if self._higher_priority_saturated(pool):
+            pool.shed += 1
+            return False
+        if pool.in_flight < pool.concurrency and not pool.waiters:
+            pool.in_flight += 1
+            pool.admitted += 1
+            return True
+        if len(pool.waiters) >= pool.queue_size:
+            pool.shed += 1
+            return False
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        pool.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right when the timeout fired, pass it on
+                self.release(pool)
+            pool.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(pool)
+            raise
+        finally:
+            if waiter in pool.waiters:
+                pool.waiters.remove(waiter)
+        pool.admitted += 1
+        return True
+
+    def release(self, pool: AdmissionPool) -> None:
+        # Hand the slot over to the first live waiter, in_flight stays the same
+        while pool.waiters:
+            waiter = pool.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        pool.in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware limiting concurrent requests per route class.
+
+    `classify(method, path)` returns the pool name for a request or None to let it through unlimited.
+    Shed requests get a fast 503 with a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        classify: Callable[[str, str], Optional[str]],
+    ):
+        self.app = app
+        self.controller = controller
+        self.classify = classify
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        pool_name = self.classify(scope['method'], scope['path'])
+        pool = self.controller.pools.get(pool_name) if pool_name else None
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(pool):
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(pool)
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({'detail': 'Server is overloaded, retry later'}).encode('utf-8')
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': 503,
+                'headers': [
+                    (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode('latin-1')),
+                    (b'retry-after', str(self.controller.retry_after).encode('latin-1')),
+                ],
+            },
+        )
+        await send({'type': 'http.response.body', 'body': body})
+
+
+admission_controller = AdmissionController(
+    pools=[
+        AdmissionPool(
+            name='critical',
+            priority=0,
+            concurrency=settings.ADMISSION_CRITICAL_CONCURRENCY,
+            queue_size=settings.ADMISSION_CRITICAL_QUEUE_SIZE,
+        ),
+        AdmissionPool(
+            name='auth',
+            priority=1,
+            concurrency=settings.ADMISSION_AUTH_CONCURRENCY,
+            queue_size=settings.ADMISSION_AUTH_QUEUE_SIZE,
+        ),
+        AdmissionPool(
+            name='bulk',
+            priority=2,
+            concurrency=settings.ADMISSION_BULK_CONCURRENCY,
+            queue_size=settings.ADMISSION_BULK_QUEUE_SIZE,
+        ),
+    ],
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
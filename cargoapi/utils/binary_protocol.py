@@ -0,0 +1,123 @@
+"""
+Fixed-layout binary frames for /cargos/calculate and /cargos/calculate/batch (little-endian).
+
+The request is laid out by columns so that all numeric fields are decoded with a single struct call:
+    uint16 count, int32[count] tariff dates (proleptic Gregorian ordinals), int64[count] total prices,
+    uint16[count] cargo type name lengths, then the utf-8 cargo type names back to back.
+Response: uint16 count, then per item: uint8 status (0 - ok, 1 - tariff not found), float64 result.
+"""
+import collections.abc
+import functools
+import itertools
+import struct
+from datetime import date
+from typing import Optional
+
+from cargoapi.schemas.cargos import CargoCalculateItem, CargoCalculateQuery
+
+CALCULATE_CONTENT_TYPE = 'application/x-cargo-calculate'
+
+STATUS_OK = 0
+STATUS_NOT_FOUND = 1
+
+_COUNT = struct.Struct('<H')
+_SINGLE_ITEM = struct.Struct('<HiqH')
+_RESPONSE_ITEM = struct.Struct('<Bd')
+
+
+class BinaryFrameError(ValueError):
+    pass
+
+
+def is_binary_content_type(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    return content_type.split(';', 1)[0].strip() == CALCULATE_CONTENT_TYPE
+
+
+def accepts_binary(accept: Optional[str]) -> bool:
+    """
+    Whether `accept` lists the binary media type with a non-zero q, wildcards keep the JSON default.
+    """
+    if not accept:
+        return False
+    for media_range in accept.split(','):
+        media_type, *params = media_range.split(';')
+        if media_type.strip().lower() != CALCULATE_CONTENT_TYPE:
+            continue
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+@functools.lru_cache(maxsize=256)
+def _columns(count: int) -> struct.Struct:
+    return struct.Struct(f'<{count}i{count}q{count}H')
+
+
+def encode_calculate_request(items: collections.abc.Sequence[CargoCalculateQuery]) -> bytes:
+    names = [item.cargo_type_name.encode('utf-8') for item in items]
+    columns = _columns(len(items)).pack(
+        *(item.tariff_date.toordinal() for item in items),
+        *(item.total_price for item in items),
+        *(len(name) for name in names),
+    )
+    return _COUNT.pack(len(items)) + columns + b''.join(names)
+
+
+def decode_calculate_request(data: bytes, max_items: int) -> list[CargoCalculateItem]:
+    """
+    Decode a request frame without pydantic validation, the layout already fixes the field types.
+    """
+    if len(data) < _COUNT.size:
+        raise BinaryFrameError('Truncated frame')
+    (count,) = _COUNT.unpack_from(data, 0)
+    if count > max_items:
+        raise BinaryFrameError(f'Too many items in frame: {count} > {max_items}')
+    try:
+        if count == 1:
+            # /cargos/calculate always sends one item, skip the column bookkeeping
+            _, ordinal, total_price, name_length = _SINGLE_ITEM.unpack_from(data, 0)
+            if _SINGLE_ITEM.size + name_length != len(data):
+                raise BinaryFrameError('Frame length does not match its items')
+            name = data[_SINGLE_ITEM.size :].decode('utf-8')
+            return [CargoCalculateItem(date.fromordinal(ordinal), name, total_price)]
+        columns = _columns(count)
+        fields = columns.unpack_from(data, _COUNT.size)
+        tariff_dates = list(map(date.fromordinal, fields[:count]))
+        total_prices = fields[count : 2 * count]
+        name_lengths = fields[2 * count :]
+        names_start = _COUNT.size + columns.size
+        if names_start + sum(name_lengths) != len(data):
+            raise BinaryFrameError('Frame length does not match its items')
+        offsets = list(itertools.accumulate(name_lengths, initial=names_start))
+        names = [data[begin:end].decode('utf-8') for begin, end in zip(offsets, offsets[1:])]
+    except (struct.error, ValueError, OverflowError) as e:
+        if isinstance(e, BinaryFrameError):
+            raise
+        raise BinaryFrameError(f'Malformed frame: {e}') from e
+    return list(itertools.starmap(CargoCalculateItem, zip(tariff_dates, names, total_prices)))
+
+
+def encode_calculate_response(results: list[Optional[float]]) -> bytes:
+    chunks = [_COUNT.pack(len(results))]
+    for result in results:
+        if result is None:
+            chunks.append(_RESPONSE_ITEM.pack(STATUS_NOT_FOUND, 0.0))
+        else:
+            chunks.append(_RESPONSE_ITEM.pack(STATUS_OK, result))
+    return b''.join(chunks)
+
+
+def decode_calculate_response(data: bytes) -> list[Optional[float]]:
+    (count,) = _COUNT.unpack_from(data, 0)
+    return [
+        result if status == STATUS_OK else None
+        for status, result in _RESPONSE_ITEM.iter_unpack(data[_COUNT.size : _COUNT.size + count * _RESPONSE_ITEM.size])
+    ]
@@ -0,0 +1,34 @@
+import collections
+import time
+from typing import Generic, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class TTLCache(Generic[T]):
+    """
+    In-process cache with a per-entry time to live and a bounded size (oldest entries are evicted first).
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: collections.OrderedDict[Hashable, tuple[float, T]] = collections.OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        if self.ttl <= 0:
+            return
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
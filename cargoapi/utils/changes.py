@@ -0,0 +1,104 @@
+import asyncio
+import collections
+import contextlib
+import json
+import uuid
+from typing import Any, AsyncIterator, Optional
+
+from cargoapi.core.config import settings
+
+# Client reconnection delay announced in the stream
+RECONNECT_DELAY_MS = 3000
+
+
+class TariffChangeHub:
+    """
+    In-process fan-out of tariff change notifications for the /cargos/changes SSE stream.
+
+    Every change gets a sequence number and is kept in a bounded history, so a reconnecting client
+    resumes from its Last-Event-ID. Subscribers hold no queue of their own, they all wait on one shared
+    event that is replaced on every publish, which keeps idle subscribers cheap.
+
+    Delivery is per process as well: a subscriber only receives the changes committed through the worker
+    process it is connected to, changes made through other workers are not relayed.
+
+    Sequence numbers are per process: event ids carry the process epoch, a client resuming against
+    another worker (or after a restart) or one that fell out of the history gets a `reset` event
+    and should re-read GET /cargos/. The initial frame and the heartbeats carry the current id, so a client
+    always has a Last-Event-ID to resume from.
+    """
+
+    def __init__(self, history_size: int):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.subscribers = 0
+        self._seq = 0
+        self._history: collections.deque[tuple[int, str]] = collections.deque(maxlen=history_size)
+        self._changed = asyncio.Event()
+
+    @property
+    def version(self) -> str:
+        return f'{self.epoch}:{self._seq}'
+
+    def publish(self, action: str, **data: Any) -> int:
+        self._seq += 1
+        payload = json.dumps({'seq': self._seq, 'action': action, **data}, default=str, separators=(',', ':'))
+        self._history.append((self._seq, payload))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        return self._seq
+
+    def parse_last_event_id(self, last_event_id: Optional[str]) -> Optional[int]:
+        """
+        Sequence number to resume after, None when the id was issued by another process or is malformed.
+        """
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.partition(':')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _missed(self, last_seq: int) -> Optional[list[tuple[int, str]]]:
+        if last_seq >= self._seq:
+            return []
+        if not self._history or self._history[0][0] > last_seq + 1:
+            return None
+        return [(seq, payload) for seq, payload in self._history if seq > last_seq]
+
+    async def stream(self, last_event_id: Optional[str], heartbeat: float) -> AsyncIterator[str]:
+        """
+        Yield server-sent events, replaying the changes missed since `last_event_id`.
+        """
+        self.subscribers += 1
+        try:
+            last_seq = self.parse_last_event_id(last_event_id)
+            if last_seq is None:
+                if last_event_id:
+                    yield self._reset_event()
+                last_seq = self._seq
+            # The id lets a client that reconnects before any change reaches it resume without a gap
+            yield f'retry: {RECONNECT_DELAY_MS}\nid: {self.epoch}:{last_seq}\n\n'
+            while True:
+                # Take the event before reading the history so a publish in between still wakes us up
+                changed = self._changed
+                missed = self._missed(last_seq)
+                if missed is None:
+                    last_seq = self._seq
+                    yield self._reset_event()
+                    continue
+                for seq, payload in missed:
+                    yield f'id: {self.epoch}:{seq}\nevent: tariff\ndata: {payload}\n\n'
+                    last_seq = seq
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(heartbeat):
+                        await changed.wait()
+                if not changed.is_set():
+                    yield f': ping\nid: {self.epoch}:{last_seq}\n\n'
+        finally:
+            self.subscribers -= 1
+
+    def _reset_event(self) -> str:
+        return f'id: {self.version}\nevent: reset\ndata: {{}}\n\n'
+
+
+tariff_change_hub = TariffChangeHub(history_size=settings.TARIFF_CHANGES_HISTORY_SIZE)
@@ -0,0 +1,169 @@
+import dataclasses
+import gzip
+import zlib
+from typing import Any, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cargoapi.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional, responses are only gzipped without it
+    brotli = None
+
+GZIP = 'gzip'
+BROTLI = 'br'
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ResponseCompressor:
+    """
+    Content-Encoding negotiation and compression settings shared by the middleware and the cached responses.
+
+    Brotli is preferred when the `brotli` package is installed and the client accepts it.
+    """
+
+    def __init__(self, minimum_size: int, gzip_level: int, brotli_quality: int):
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        if not accept_encoding:
+            return None
+        accepted, refused = set(), set()
+        for token in accept_encoding.split(','):
+            coding, _, params = token.partition(';')
+            quality = params.strip().removeprefix('q=')
+            # q=0 refuses the coding
+            (refused if quality and not quality.strip('0.') else accepted).add(coding.strip().lower())
+        for encoding in self.encodings:
+            if encoding not in refused and (encoding in accepted or '*' in accepted):
+                return encoding
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == BROTLI:
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def stream(self, encoding: str) -> Any:
+        if encoding == BROTLI:
+            return brotli.Compressor(quality=self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+
+@dataclasses.dataclass
+class PrecompressedBody:
+    """
+    Response body serialized once and compressed at most once per encoding, for responses cached between requests.
+    """
+
+    body: bytes
+    encoded: dict[str, bytes] = dataclasses.field(default_factory=dict)
+
+    def get(self, compressor: ResponseCompressor, encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        if encoding is None or len(self.body) < compressor.minimum_size:
+            return self.body, None
+        encoded = self.encoded.get(encoding)
+        if encoded is None:
+            encoded = self.encoded[encoding] = compressor.compress(self.body, encoding)
+        return encoded, encoding
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least `minimum_size` bytes, streamed responses chunk by chunk.
+
+    Responses that already carry a Content-Encoding (e.g. PrecompressedBody) and the excluded media types
+    (server-sent events have to reach the client event by event) are passed through.
+    """
+
+    def __init__(self, app: ASGIApp, compressor: ResponseCompressor, exclude_media_types: tuple[str, ...] = ()):
+        self.app = app
+        self.compressor = compressor
+        self.exclude_media_types = exclude_media_types
+
+    def _skip(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if 'content-encoding' in headers:
+            return True
+        if headers.get('content-type', '').split(';', 1)[0].strip() in self.exclude_media_types:
+            return True
+        return not more_body and len(body) < max(self.compressor.minimum_size, 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+                break
+        encoding = self.compressor.negotiate(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        stream: Any = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, stream, passthrough
+            if message['type'] == 'http.response.start':
+                # Held back until the first body chunk tells whether the response is worth compressing
+                start_message = message
+                return
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(scope=start)
+                if self._skip(headers, body, more_body):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers['Content-Encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                if not more_body:
+                    body = self.compressor.compress(body, encoding)
+                    headers['Content-Length'] = str(len(body))
+                    await send(start)
+                    await send({'type': 'http.response.body', 'body': body})
+                    return
+                del headers['Content-Length']
+                stream = self.compressor.stream(encoding)
+                await send(start)
+
+            chunk = stream.process(body)
+            if not more_body:
+                chunk += stream.finish()
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+response_compressor = ResponseCompressor(
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
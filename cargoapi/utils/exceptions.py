@@ -9,3 +9,15 @@ class ApiExceptionsError:
     @staticmethod
     def bad_request_400(detail: str = 'Bad Request') -> HTTPException:
         return HTTPException(detail=detail, status_code=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def forbidden_403(detail: str = 'Forbidden') -> HTTPException:
+        return HTTPException(detail=detail, status_code=status.HTTP_403_FORBIDDEN)
+
+    @staticmethod
+    def unprocessable_entity_422(detail: str = 'Unprocessable Entity') -> HTTPException:
+        return HTTPException(detail=detail, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    @staticmethod
+    def service_unavailable_503(detail: str = 'Service Unavailable') -> HTTPException:
+        return HTTPException(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
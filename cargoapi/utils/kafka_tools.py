@@ -1,32 +1,141 @@
 import asyncio
+import contextlib
 import json
-from typing import Any
+import time
+from typing import Any, Optional
 
 from aiokafka import AIOKafkaProducer
 
 from cargoapi.core.config import settings
 
 
+class KafkaUnavailableError(Exception):
+    """Raised when a message can not be sent because Kafka is not reachable."""
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through (half-open state).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        return self.state != self.OPEN
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
 class KafkaProducerService:
-    def __init__(self, bootstrap_servers: str):
-        self._producer = AIOKafkaProducer(
-            bootstrap_servers=bootstrap_servers,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-        )
-
-    async def start(self) -> None:
-        """Start the Kafka producer."""
-        # Ensure we are using the correct event loop
-        asyncio.get_event_loop()
-        await self._producer.start()
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        connect_timeout: float,
+        send_timeout: float,
+        breaker: CircuitBreaker,
+        connect_retry_delay: float,
+    ):
+        self._bootstrap_servers = bootstrap_servers
+        self._connect_timeout = connect_timeout
+        self._connect_retry_delay = connect_retry_delay
+        self._send_timeout = send_timeout
+        self._breaker = breaker
+        self._producer: Optional[AIOKafkaProducer] = None
+        self._connect_task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._producer is not None
+
+    @property
+    def state(self) -> str:
+        return 'connected' if self.is_connected else self._breaker.state
+
+    def start_in_background(self) -> None:
+        """Schedule the connection to Kafka without blocking the caller."""
+        if self._producer is not None:
+            return
+        if self._connect_task is None or self._connect_task.done():
+            self._connect_task = asyncio.get_running_loop().create_task(self._connect())
+
+    async def _connect(self) -> None:
+        while self._producer is None:
+            # Wait out the open breaker before trying again
+            if not self._breaker.allow_request():
+                await asyncio.sleep(self._breaker.reset_timeout)
+                continue
+            producer = AIOKafkaProducer(
+                bootstrap_servers=self._bootstrap_servers,
+                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+            )
+            try:
+                await asyncio.wait_for(producer.start(), timeout=self._connect_timeout)
+            except Exception:  # noqa: B902
+                self._breaker.record_failure()
+                with contextlib.suppress(Exception):
+                    await producer.stop()
+                # A refused connection fails at once, without a pause the attempts would run back to back
+                await asyncio.sleep(self._connect_retry_delay)
+                continue
+            self._breaker.record_success()
+            self._producer = producer
 
     async def stop(self) -> None:
         """Stop the Kafka producer."""
-        await self._producer.stop()
+        if self._connect_task is not None and not self._connect_task.done():
+            self._connect_task.cancel()
+        if self._producer is not None:
+            await self._producer.stop()
+            self._producer = None
 
     async def send_message(self, topic: str, message: dict[str, Any]) -> None:
         """Send a message to a Kafka topic."""
-        await self._producer.send_and_wait(topic, message)
+        if self._producer is None:
+            self.start_in_background()
+            raise KafkaUnavailableError('Kafka producer is not connected yet')
+        if not self._breaker.allow_request():
+            raise KafkaUnavailableError('Kafka circuit breaker is open')
+        try:
+            await asyncio.wait_for(self._producer.send_and_wait(topic, message), timeout=self._send_timeout)
+        except Exception:  # noqa: B902
+            self._breaker.record_failure()
+            raise
+        self._breaker.record_success()
 
 
-kafka_producer = KafkaProducerService(bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS)
+kafka_producer = KafkaProducerService(
+    bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+    connect_timeout=settings.KAFKA_CONNECT_TIMEOUT_SECONDS,
+    send_timeout=settings.KAFKA_SEND_TIMEOUT_SECONDS,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.KAFKA_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.KAFKA_BREAKER_RESET_SECONDS,
+    ),
+    connect_retry_delay=settings.KAFKA_CONNECT_RETRY_SECONDS,
+)
@@ -0,0 +1,200 @@
+"""
+Optional yearly range partitioning of cargo_tariffs by tariff_date.
+
+The application checks pg_partitioned_table at runtime, the layout is switched explicitly:
+    python -m cargoapi.utils.partitions enable    # rebuild cargo_tariffs partitioned by year
+    python -m cargoapi.utils.partitions disable   # back to a single table, archived years stay detached
+    python -m cargoapi.utils.partitions archive [--keep-years N]    # `make archive-tariffs`
+"""
+import argparse
+import asyncio
+import collections.abc
+import re
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from cargoapi.core.config import settings
+from cargoapi.database import async_engine
+
+_PARTITION_NAME = re.compile(r'^cargo_tariffs_y(\d{4})$')
+_ARCHIVE_NAME = re.compile(r'^cargo_tariffs_archive_y(\d{4})$')
+
+
+def partition_name(year: int) -> str:
+    return f'cargo_tariffs_y{year}'
+
+
+def archive_name(year: int) -> str:
+    return f'cargo_tariffs_archive_y{year}'
+
+
+def _create_partition_sql(year: int, parent: str = 'cargo_tariffs') -> str:
+    return (
+        f'CREATE TABLE IF NOT EXISTS {partition_name(year)} PARTITION OF {parent} '
+        f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    )
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    result = await conn.execute(
+        text("SELECT count(*) FROM pg_partitioned_table WHERE partrelid = 'cargo_tariffs'::regclass"),
+    )
+    return bool(result.scalar())
+
+
+async def attached_partition_years(conn: AsyncConnection) -> list[int]:
+    result = await conn.execute(
+        text(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            "WHERE pg_inherits.inhparent = 'cargo_tariffs'::regclass",
+        ),
+    )
+    return sorted(int(match.group(1)) for (name,) in result if (match := _PARTITION_NAME.match(name)))
+
+
+async def archived_years(conn: AsyncConnection) -> list[int]:
+    result = await conn.execute(
+        text("SELECT relname FROM pg_class WHERE relkind = 'r' AND relname LIKE 'cargo\\_tariffs\\_archive\\_y%'"),
+    )
+    return sorted(int(match.group(1)) for (name,) in result if (match := _ARCHIVE_NAME.match(name)))
+
+
+async def ensure_tariff_partitions(years: collections.abc.Iterable[int]) -> list[int]:
+    """
+    Prepare cargo_tariffs for rows of `years`, before the upload transaction starts.
+
+    Missing partitions are created in their own short autocommit transactions: creating a partition locks
+    the whole parent table, inside the upload transaction the lock would be held until the import commits.
+    Returns the archived years among `years`, nothing is created for them. Does nothing when cargo_tariffs
+    is not partitioned.
+    """
+    years = set(years)
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level='AUTOCOMMIT')
+        if not years or not await is_partitioned(conn):
+            return []
+        archived = sorted(years.intersection(await archived_years(conn)))
+        if archived:
+            return archived
+        for year in sorted(years.difference(await attached_partition_years(conn))):
+            await conn.execute(text(_create_partition_sql(year)))
+    return []
+
+
+async def enable_partitioning(conn: AsyncConnection) -> None:
+    """
+    Rebuild cargo_tariffs as a table partitioned by year, with partitions for the existing data plus the current
+    and next year. A partitioned table needs tariff_date in its primary key, and tariff_date gets a BRIN index
+    instead of the btree: rows are written in date order within a year.
+    """
+    years = (
+        await conn.execute(
+            text(
+                'SELECT min(extract(year FROM tariff_date))::int, max(extract(year FROM tariff_date))::int '
+                'FROM cargo_tariffs',
+            ),
+        )
+    ).one()
+    current_year = date.today().year
+    first_year = min(years[0] or current_year, current_year)
+    last_year = max(years[1] or current_year, current_year + 1)
+
+    await conn.execute(
+        text('CREATE TABLE cargo_tariffs_partitioned (LIKE cargo_tariffs) PARTITION BY RANGE (tariff_date)'),
+    )
+    for year in range(first_year, last_year + 1):
+        await conn.execute(text(_create_partition_sql(year, parent='cargo_tariffs_partitioned')))
+    await conn.execute(text('INSERT INTO cargo_tariffs_partitioned SELECT * FROM cargo_tariffs'))
+    await conn.execute(text('DROP TABLE cargo_tariffs'))
+    await conn.execute(text('ALTER TABLE cargo_tariffs_partitioned RENAME TO cargo_tariffs'))
+    # Indexes and constraints on the parent are created on every partition, also on the future ones
+    await _add_constraints(conn, primary_key='uid, tariff_date')
+    await conn.execute(
+        text('CREATE INDEX ix_cargo_tariffs_tariff_date_brin ON cargo_tariffs USING brin (tariff_date)'),
+    )
+
+
+async def disable_partitioning(conn: AsyncConnection) -> None:
+    """
+    Rebuild cargo_tariffs as a single table with the layout of the migrations.
+    """
+    await conn.execute(text('CREATE TABLE cargo_tariffs_heap (LIKE cargo_tariffs)'))
+    await conn.execute(text('INSERT INTO cargo_tariffs_heap SELECT * FROM cargo_tariffs'))
+    await conn.execute(text('DROP TABLE cargo_tariffs'))
+    await conn.execute(text('ALTER TABLE cargo_tariffs_heap RENAME TO cargo_tariffs'))
+    await _add_constraints(conn, primary_key='uid')
+    await conn.execute(text('CREATE INDEX ix_cargo_tariffs_tariff_date ON cargo_tariffs (tariff_date)'))
+
+
+async def _add_constraints(conn: AsyncConnection, primary_key: str) -> None:
+    await conn.execute(
+        text(f'ALTER TABLE cargo_tariffs ADD CONSTRAINT cargo_tariffs_pkey PRIMARY KEY ({primary_key})'),
+    )
+    await conn.execute(
+        text(
+            'ALTER TABLE cargo_tariffs ADD CONSTRAINT uq_cargo_tariffs_cargo_type_date '
+            'UNIQUE (to_cargo_type_uid, tariff_date)',
+        ),
+    )
+    await conn.execute(
+        text(
+            'ALTER TABLE cargo_tariffs ADD CONSTRAINT cargo_tariffs_to_cargo_type_uid_fkey '
+            'FOREIGN KEY (to_cargo_type_uid) REFERENCES cargo_types (uid)',
+        ),
+    )
+
+
+async def archive_tariff_partitions(keep_years: int, today: Optional[date] = None) -> list[str]:
+    """
+    Detach the partitions of the years before the last `keep_years` ones and rename them to
+    cargo_tariffs_archive_y<year>, the rows stay in these tables and drop out of every query on cargo_tariffs.
+    Uploads for these years are rejected from then on, see ensure_tariff_partitions.
+
+    DETACH ... CONCURRENTLY does not block reads and writes of the other partitions but can not run
+    in a transaction, hence the autocommit connection.
+    """
+    first_kept_year = (today or date.today()).year - keep_years + 1
+    archived = []
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level='AUTOCOMMIT')
+        for year in await attached_partition_years(conn):
+            if year >= first_kept_year:
+                break
+            await conn.execute(text(f'ALTER TABLE cargo_tariffs DETACH PARTITION {partition_name(year)} CONCURRENTLY'))
+            await conn.execute(text(f'ALTER TABLE {partition_name(year)} RENAME TO {archive_name(year)}'))
+            archived.append(archive_name(year))
+    return archived
+
+
+async def _switch_partitioning(enable: bool) -> str:
+    layout = 'partitioned by year' if enable else 'a single table'
+    async with async_engine.begin() as conn:
+        if await is_partitioned(conn) == enable:
+            return f'cargo_tariffs is already {layout}'
+        await (enable_partitioning(conn) if enable else disable_partitioning(conn))
+    return f'cargo_tariffs is now {layout}'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='cargo_tariffs partitions maintenance')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('enable', help='partition cargo_tariffs by year')
+    subparsers.add_parser('disable', help='turn cargo_tariffs back into a single table')
+    archive_parser = subparsers.add_parser('archive', help='detach the partitions of old years')
+    archive_parser.add_argument('--keep-years', type=int, default=settings.TARIFF_PARTITION_KEEP_YEARS)
+    args = parser.parse_args()
+
+    if args.command in ('enable', 'disable'):
+        parser.exit(0, asyncio.run(_switch_partitioning(args.command == 'enable')) + '\n')
+    if args.keep_years < 1:
+        parser.exit(0, 'Archival is disabled (keep years < 1)\n')
+    archived = asyncio.run(archive_tariff_partitions(args.keep_years))
+    parser.exit(0, ''.join(f'Detached {name}\n' for name in archived) or 'Nothing to archive\n')
+
+
+if __name__ == '__main__':
+    main()
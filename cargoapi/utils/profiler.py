@@ -0,0 +1,176 @@
+import asyncio
+import collections
+import collections.abc
+import hmac
+import random
+import sys
+import threading
+import time
+import uuid
+from types import CodeType
+from typing import Any, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cargoapi.core.config import settings
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of another thread at a fixed interval and counts the folded stacks.
+
+    Requests share the event loop thread, so samples taken while a request is profiled also include
+    whatever else the loop was running at that moment (and idle time in the selector).
+
+    The samples are handed to `on_finish` from the sampler thread once stop() was called, so the caller never
+    waits for the thread.
+    """
+
+    def __init__(
+        self,
+        target_thread_id: int,
+        interval: float,
+        max_seconds: float,
+        on_finish: collections.abc.Callable[[collections.Counter[str]], None],
+    ):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: collections.Counter[str] = collections.Counter()
+        self._on_finish = on_finish
+        self._stop_event = threading.Event()
+        self._labels: dict[CodeType, str] = {}
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'.replace(';', ':')
+        return label
+
+    def run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.target_thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+        # Past max_seconds the request may still be running, its result is complete only after stop()
+        self._stop_event.wait()
+        self._on_finish(self.samples)
+
+    def stop(self) -> None:
+        # Only signals the thread, joining it here would block the event loop for up to one interval
+        self._stop_event.set()
+
+
+class ProfileStore:
+    def __init__(self, max_size: int):
+        self._profiles: collections.OrderedDict[str, dict[str, Any]] = collections.OrderedDict()
+        self.max_size = max_size
+
+    def add(self, profile: dict[str, Any]) -> None:
+        self._profiles[profile['id']] = profile
+        while len(self._profiles) > self.max_size:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[dict[str, Any]]:
+        return self._profiles.get(profile_id)
+
+    def summaries(self) -> list[dict[str, Any]]:
+        return [
+            {key: value for key, value in profile.items() if key != 'folded'}
+            for profile in reversed(self._profiles.values())
+        ]
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler, only added to the app when PROFILING_ENABLED is set.
+
+    A request is profiled when it carries `X-Profile: <PROFILING_ADMIN_TOKEN>` or is picked at
+    PROFILING_SAMPLE_RATE. One request is profiled at a time, the result id is returned in `X-Profile-Id`
+    and the folded stacks are served by /api/v1/admin/profiles.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        token: str,
+        sample_rate: float,
+        interval: float,
+        max_seconds: float,
+        exclude_prefixes: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.store = store
+        self.token = token.encode('utf-8')
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.exclude_prefixes = exclude_prefixes
+        self._active = False
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self._active or scope['path'].startswith(self.exclude_prefixes):
+            return False
+        if self.token:
+            for name, value in scope['headers']:
+                if name == b'x-profile':
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate  # noqa: S311
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        profile: dict[str, Any] = {'id': uuid.uuid4().hex, 'method': scope['method'], 'path': scope['path']}
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                message['headers'] = [*message.get('headers', []), (b'x-profile-id', profile['id'].encode('latin-1'))]
+            await send(message)
+
+        def on_finish(samples: collections.Counter[str]) -> None:
+            # Called in the sampler thread, the store is only touched on the event loop
+            try:
+                loop.call_soon_threadsafe(self._store_profile, profile, samples)
+            except RuntimeError:  # the loop was closed meanwhile, the profile is dropped
+                pass
+
+        self._active = True
+        sampler = StackSampler(threading.get_ident(), self.interval, self.max_seconds, on_finish)
+        started_at = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.update(
+                status_code=status_code,
+                duration_ms=round((time.perf_counter() - started_at) * 1000, 3),
+                created_at=time.time(),
+            )
+            sampler.stop()
+            self._active = False
+
+    def _store_profile(self, profile: dict[str, Any], samples: collections.Counter[str]) -> None:
+        self.store.add({**profile, 'samples': sum(samples.values()), 'folded': samples})
+
+
+def render_folded(samples: collections.Counter[str]) -> str:
+    """
+    Folded stacks, the input format of flamegraph.pl and speedscope.
+    """
+    return ''.join(f'{stack} {count}\n' for stack, count in samples.most_common())
+
+
+profile_store = ProfileStore(max_size=settings.PROFILING_HISTORY_SIZE)
@@ -0,0 +1,248 @@
+import array
+import asyncio
+import dataclasses
+import json
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Any, Iterator, Optional
+
+from cargoapi.core.config import settings
+
+CARGO_TYPE_NAME_MAX_LENGTH = 255
+
+TariffRow = tuple[date, str, float]
+
+DUPLICATE_DATE_ERROR = 'Duplicate tariff date'
+
+
+@dataclasses.dataclass
+class TariffRows:
+    """
+    Validated (tariff date, cargo type name, rate) rows stored by columns.
+
+    Columns of typed arrays pickle as plain bytes, which keeps the transfer out of the process pool cheap.
+    """
+
+    cargo_type_names: list[str] = dataclasses.field(default_factory=list)
+    cargo_type_indexes: 'array.array[int]' = dataclasses.field(default_factory=lambda: array.array('I'))
+    date_ordinals: 'array.array[int]' = dataclasses.field(default_factory=lambda: array.array('i'))
+    rates: 'array.array[float]' = dataclasses.field(default_factory=lambda: array.array('d'))
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    def __iter__(self) -> Iterator[TariffRow]:
+        names = self.cargo_type_names
+        for ordinal, name_index, rate in zip(self.date_ordinals, self.cargo_type_indexes, self.rates):
+            yield date.fromordinal(ordinal), names[name_index], rate
+
+    def extend(self, other: 'TariffRows') -> None:
+        offset = len(self.cargo_type_names)
+        self.cargo_type_names.extend(other.cargo_type_names)
+        self.cargo_type_indexes.extend(index + offset for index in other.cargo_type_indexes)
+        self.date_ordinals.extend(other.date_ordinals)
+        self.rates.extend(other.rates)
+
+
+@dataclasses.dataclass
+class TariffValidationReport:
+    rows: TariffRows = dataclasses.field(default_factory=TariffRows)
+    errors: list[dict[str, Any]] = dataclasses.field(default_factory=list)
+    error_count: int = 0
+    # Ordinal -> key as written, of every valid top-level date, to find the same date in different segments
+    tariff_dates: dict[int, str] = dataclasses.field(default_factory=dict)
+
+    def add_error(self, tariff_date: Optional[str], index: Optional[int], field: Optional[str], error: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < settings.TARIFF_VALIDATION_MAX_ERRORS:
+            self.errors.append({'tariff_date': tariff_date, 'index': index, 'field': field, 'error': error})
+
+    def merge(self, other: 'TariffValidationReport') -> None:
+        for ordinal, date_str in other.tariff_dates.items():
+            if ordinal in self.tariff_dates:
+                self.add_error(date_str, None, 'tariff_date', DUPLICATE_DATE_ERROR)
+            else:
+                self.tariff_dates[ordinal] = date_str
+        self.rows.extend(other.rows)
+        self.error_count += other.error_count
+        self.errors.extend(other.errors[: max(settings.TARIFF_VALIDATION_MAX_ERRORS - len(self.errors), 0)])
+
+
+def _validate_items(items: list[tuple[Any, Any]]) -> TariffValidationReport:
+    report = TariffValidationReport()
+    rows = report.rows
+    name_indexes: dict[str, int] = {}
+    for date_str, tariffs in items:
+        try:
+            tariff_ordinal = datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+        except (TypeError, ValueError):
+            report.add_error(date_str, None, 'tariff_date', 'Expected a date in YYYY-MM-DD format')
+            continue
+        if tariff_ordinal in report.tariff_dates:
+            report.add_error(date_str, None, 'tariff_date', DUPLICATE_DATE_ERROR)
+            continue
+        report.tariff_dates[tariff_ordinal] = date_str
+        if not isinstance(tariffs, list):
+            report.add_error(date_str, None, None, 'Expected a list of tariffs')
+            continue
+
+        seen_cargo_types = set()
+        for index, tariff in enumerate(tariffs):
+            if not isinstance(tariff, dict):
+                report.add_error(date_str, index, None, 'Expected an object with cargo_type and rate')
+                continue
+            cargo_type_name = tariff.get('cargo_type')
+            if not isinstance(cargo_type_name, str) or not cargo_type_name.strip():
+                report.add_error(date_str, index, 'cargo_type', 'Expected a non-empty string')
+                continue
+            if len(cargo_type_name) > CARGO_TYPE_NAME_MAX_LENGTH:
+                report.add_error(date_str, index, 'cargo_type', f'Longer than {CARGO_TYPE_NAME_MAX_LENGTH} characters')
+                continue
+            if cargo_type_name in seen_cargo_types:
+                report.add_error(date_str, index, 'cargo_type', 'Duplicate cargo type for this date')
+                continue
+            seen_cargo_types.add(cargo_type_name)
+            try:
+                rate = float(tariff.get('rate'))  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                report.add_error(date_str, index, 'rate', 'Expected a number')
+                continue
+            if not math.isfinite(rate) or rate < 0:
+                report.add_error(date_str, index, 'rate', 'Expected a finite non-negative number')
+                continue
+
+            name_index = name_indexes.get(cargo_type_name)
+            if name_index is None:
+                name_index = name_indexes[cargo_type_name] = len(rows.cargo_type_names)
+                rows.cargo_type_names.append(cargo_type_name)
+            rows.cargo_type_indexes.append(name_index)
+            rows.date_ordinals.append(tariff_ordinal)
+            rows.rates.append(rate)
+    return report
+
+
+def _load_object_items(raw: bytes) -> Optional[list[tuple[Any, Any]]]:
+    """
+    Parse a JSON object into its (key, value) pairs, duplicate keys included: json.loads keeps only the last one.
+
+    Nested objects are plain dicts. Returns None when `raw` is not valid JSON or not an object.
+    """
+    last_object, last_pairs = None, None
+
+    def object_pairs_hook(pairs: list[tuple[Any, Any]]) -> dict[Any, Any]:
+        nonlocal last_object, last_pairs
+        # Objects are built inner first, the top-level one is built last
+        last_object, last_pairs = dict(pairs), pairs
+        return last_object
+
+    try:
+        loaded = json.loads(raw, object_pairs_hook=object_pairs_hook)
+    except ValueError:
+        return None
+    return last_pairs if loaded is last_object else None
+
+
+def validate_tariffs_file(raw_file: bytes) -> TariffValidationReport:
+    items = _load_object_items(raw_file)
+    if items is None:
+        report = TariffValidationReport()
+        report.add_error(None, None, None, 'Expected a JSON object of {"YYYY-MM-DD": [tariffs]}')
+        return report
+    return _validate_items(items)
+
+
+def validate_tariffs_segment(segment: bytes) -> Optional[TariffValidationReport]:
+    """
+    Validate a slice of the top-level object produced by _split_file, runs inside the process pool.
+
+    Returns None when the slice is not valid JSON on its own, i.e. the split point was not a real entry boundary.
+    """
+    items = _load_object_items(b'{' + segment + b'}')
+    if items is None:
+        return None
+    return _validate_items(items)
+
+
+# Start of a top-level `"YYYY-MM-DD": [` entry
+_DATE_ENTRY = re.compile(rb'"\d{4}-\d{2}-\d{2}"\s*:\s*\[')
+
+
+def _split_file(raw_file: bytes, parts: int) -> Optional[list[bytes]]:
+    """
+    Cut the inner part of the top-level object into about equal slices at date entries.
+
+    A false match inside a string makes one of the slices invalid JSON, which validate_tariffs_segment detects.
+    """
+    body = raw_file.strip()
+    if not body.startswith(b'{') or not body.endswith(b'}'):
+        return None
+    inner = body[1:-1]
+    cuts = [0]
+    for part in range(1, parts):
+        match = _DATE_ENTRY.search(inner, max(len(inner) * part // parts, cuts[-1] + 1))
+        if not match:
+            break
+        cuts.append(match.start())
+    cuts.append(len(inner))
+    segments = [inner[begin:end].strip() for begin, end in zip(cuts, cuts[1:])]
+    for index, segment in enumerate(segments[:-1]):
+        if not segment.endswith(b','):
+            return None
+        segments[index] = segment[:-1]
+    return segments
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _process_pool_size() -> int:
+    return settings.TARIFF_VALIDATION_WORKERS or os.cpu_count() or 1
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool  # pylint: disable=global-statement
+    if _process_pool is None:
+        # spawn: forking a process that already runs the event loop and helper threads is unsafe
+        _process_pool = ProcessPoolExecutor(
+            max_workers=_process_pool_size(),
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool  # pylint: disable=global-statement
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+async def validate_cargo_tariffs(raw_file: bytes) -> TariffValidationReport:
+    """
+    Validate a whole upload file before anything is written.
+
+    Files of at least TARIFF_VALIDATION_PARALLEL_THRESHOLD_BYTES are cut into one slice per worker of a process
+    pool, each worker parses and validates its own slice. Smaller files are validated in the threadpool.
+    """
+    loop = asyncio.get_running_loop()
+    if len(raw_file) < settings.TARIFF_VALIDATION_PARALLEL_THRESHOLD_BYTES:
+        return await loop.run_in_executor(None, validate_tariffs_file, raw_file)
+
+    segments = _split_file(raw_file, _process_pool_size())
+    if not segments:
+        return await loop.run_in_executor(None, validate_tariffs_file, raw_file)
+    pool = _get_process_pool()
+    segment_reports = await asyncio.gather(
+        *(loop.run_in_executor(pool, validate_tariffs_segment, segment) for segment in segments),
+    )
+    if any(segment_report is None for segment_report in segment_reports):
+        # Split at a false boundary or the file is broken: validate it as a whole to get a proper report
+        return await loop.run_in_executor(pool, validate_tariffs_file, raw_file)
+    report = TariffValidationReport()
+    for segment_report in segment_reports:
+        report.merge(segment_report)  # type: ignore[arg-type]
+    return report
@@ -0,0 +1,133 @@
+import asyncio
+
+from cargoapi.utils.admission import AdmissionControlMiddleware, AdmissionController, AdmissionPool
+
+
+def make_controller(queue_timeout: float = 1.0, **queue_sizes: int) -> AdmissionController:
+    return AdmissionController(
+        pools=[
+            AdmissionPool('critical', priority=0, concurrency=1, queue_size=queue_sizes.get('critical', 2)),
+            AdmissionPool('bulk', priority=2, concurrency=1, queue_size=queue_sizes.get('bulk', 2)),
+        ],
+        queue_timeout=queue_timeout,
+        retry_after=7,
+    )
+
+
+async def ok_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+async def call(middleware):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware({'type': 'http', 'method': 'POST', 'path': '/api/v1/cargos/load'}, None, send)
+    return messages
+
+
+def test_queued_waiter_gets_released_slot():
+    async def run():
+        controller = make_controller()
+        pool = controller.pools['bulk']
+        assert await controller.acquire(pool)
+        waiter = asyncio.create_task(controller.acquire(pool))
+        await asyncio.sleep(0)
+        assert pool.stats()['queue_depth'] == 1
+        controller.release(pool)
+        assert await waiter
+        # The slot was handed over, not freed and taken again
+        assert pool.in_flight == 1
+        assert pool.admitted == 2
+        controller.release(pool)
+        assert pool.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_shed_when_queue_full():
+    async def run():
+        controller = make_controller(bulk=1)
+        pool = controller.pools['bulk']
+        assert await controller.acquire(pool)
+        waiter = asyncio.create_task(controller.acquire(pool))
+        await asyncio.sleep(0)
+        assert not await controller.acquire(pool)
+        assert pool.shed == 1
+        controller.release(pool)
+        assert await waiter
+
+    asyncio.run(run())
+
+
+def test_timed_out_waiter_does_not_leak_in_flight():
+    async def run():
+        controller = make_controller(queue_timeout=0.01)
+        pool = controller.pools['bulk']
+        assert await controller.acquire(pool)
+        assert not await controller.acquire(pool)
+        assert pool.timed_out == 1
+        assert not pool.waiters
+        controller.release(pool)
+        assert pool.in_flight == 0
+        assert await controller.acquire(pool)
+        assert pool.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_in_flight():
+    async def run():
+        controller = make_controller()
+        pool = controller.pools['bulk']
+        assert await controller.acquire(pool)
+        waiter = asyncio.create_task(controller.acquire(pool))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert not pool.waiters
+        controller.release(pool)
+        assert pool.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_lower_priority_shed_while_critical_queues():
+    async def run():
+        controller = make_controller()
+        critical, bulk = controller.pools['critical'], controller.pools['bulk']
+        assert await controller.acquire(critical)
+        waiter = asyncio.create_task(controller.acquire(critical))
+        await asyncio.sleep(0)
+        # bulk has a free slot but critical is queueing
+        assert not await controller.acquire(bulk)
+        assert bulk.shed == 1
+        assert bulk.in_flight == 0
+        controller.release(critical)
+        assert await waiter
+        assert await controller.acquire(bulk)
+
+    asyncio.run(run())
+
+
+def test_middleware_rejects_with_retry_after():
+    async def run():
+        controller = make_controller(bulk=0)
+        assert await controller.acquire(controller.pools['bulk'])
+        return await call(AdmissionControlMiddleware(ok_app, controller, classify=lambda method, path: 'bulk'))
+
+    start, body = asyncio.run(run())
+    assert start['status'] == 503
+    assert (b'retry-after', b'7') in start['headers']
+    assert body['body'] == b'{"detail": "Server is overloaded, retry later"}'
+
+
+def test_middleware_releases_slot():
+    controller = make_controller()
+    middleware = AdmissionControlMiddleware(ok_app, controller, classify=lambda method, path: 'bulk')
+    start, _ = asyncio.run(call(middleware))
+    assert start['status'] == 200
+    assert controller.pools['bulk'].in_flight == 0
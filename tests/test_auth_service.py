@@ -0,0 +1,33 @@
+import asyncio
+from typing import Optional
+from unittest import mock
+
+import pytest
+
+from cargoapi.models.api.v1.users import User
+from cargoapi.schemas.auth import Login
+from cargoapi.services.auth_service import AuthService
+from cargoapi.utils.password_hash import hash_password
+
+
+def get_user_by_credentials(password: str, user: Optional[User]) -> Optional[User]:
+    session = mock.AsyncMock()
+    session.execute.return_value = mock.Mock(**{'scalars.return_value.first.return_value': user})
+    return asyncio.run(AuthService().get_user_by_credentials(Login(username='user', password=password), session))
+
+
+@pytest.fixture(scope='module')
+def user():
+    return User(username='user', password=hash_password('secret'))
+
+
+def test_valid_credentials(user):
+    assert get_user_by_credentials('secret', user) is user
+
+
+def test_wrong_password(user):
+    assert get_user_by_credentials('wrong', user) is None
+
+
+def test_unknown_user():
+    assert get_user_by_credentials('secret', None) is None
@@ -0,0 +1,108 @@
+import struct
+from datetime import date
+
+import pytest
+
+from cargoapi.schemas.cargos import CargoCalculateItem, CargoCalculateRate
+from cargoapi.utils import binary_protocol
+from cargoapi.utils.binary_protocol import BinaryFrameError, decode_calculate_request, encode_calculate_request
+
+ITEMS = [
+    CargoCalculateItem(date(2024, 1, 1), 'Glass', 1000),
+    CargoCalculateItem(date(1999, 12, 31), 'Стекло', 2**40),
+    CargoCalculateItem(date(2024, 2, 29), '', -5),
+]
+
+
+@pytest.mark.parametrize('items', [ITEMS[:1], ITEMS[1:2], ITEMS, []])
+def test_request_round_trip(items):
+    assert decode_calculate_request(encode_calculate_request(items), max_items=10) == items
+
+
+def test_request_from_pydantic_items():
+    item = CargoCalculateRate(tariff_date=date(2024, 1, 1), cargo_type_name='Glass', total_price=10)
+    assert decode_calculate_request(encode_calculate_request([item]), max_items=1) == [
+        CargoCalculateItem(date(2024, 1, 1), 'Glass', 10),
+    ]
+
+
+def test_response_round_trip():
+    results = [1.5, None, 0.0]
+    assert binary_protocol.decode_calculate_response(binary_protocol.encode_calculate_response(results)) == results
+
+
+@pytest.mark.parametrize('items', [ITEMS[:1], ITEMS])
+@pytest.mark.parametrize('cut', [1, 2, 5])
+def test_truncated_frame(items, cut):
+    with pytest.raises(BinaryFrameError):
+        decode_calculate_request(encode_calculate_request(items)[:-cut], max_items=10)
+
+
+def test_empty_frame():
+    with pytest.raises(BinaryFrameError, match='Truncated'):
+        decode_calculate_request(b'', max_items=10)
+
+
+@pytest.mark.parametrize('items', [ITEMS[:1], ITEMS])
+def test_extra_bytes(items):
+    with pytest.raises(BinaryFrameError):
+        decode_calculate_request(encode_calculate_request(items) + b'x', max_items=10)
+
+
+@pytest.mark.parametrize('count', [1, 2])
+def test_ordinal_zero(count):
+    frame = bytearray(encode_calculate_request(ITEMS[:count]))
+    struct.pack_into('<i', frame, 2, 0)
+    with pytest.raises(BinaryFrameError, match='Malformed'):
+        decode_calculate_request(bytes(frame), max_items=10)
+
+
+@pytest.mark.parametrize('count', [1, 3, 4])
+def test_count_mismatch(count):
+    frame = bytearray(encode_calculate_request(ITEMS[:2]))
+    struct.pack_into('<H', frame, 0, count)
+    with pytest.raises(BinaryFrameError):
+        decode_calculate_request(bytes(frame), max_items=10)
+
+
+def test_too_many_items():
+    with pytest.raises(BinaryFrameError, match='Too many items'):
+        decode_calculate_request(encode_calculate_request(ITEMS), max_items=2)
+
+
+def test_invalid_utf8_name():
+    frame = encode_calculate_request([CargoCalculateItem(date(2024, 1, 1), 'é', 1)])
+    with pytest.raises(BinaryFrameError):
+        decode_calculate_request(frame[:-1] + b'\xff', max_items=1)
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    [
+        ('application/x-cargo-calculate', True),
+        ('application/x-cargo-calculate; charset=binary', True),
+        ('application/json', False),
+        (None, False),
+    ],
+)
+def test_is_binary_content_type(value, expected):
+    assert binary_protocol.is_binary_content_type(value) is expected
+
+
+@pytest.mark.parametrize(
+    ('accept', 'expected'),
+    [
+        ('application/x-cargo-calculate', True),
+        ('application/json, application/x-cargo-calculate;q=0.5', True),
+        ('Application/X-Cargo-Calculate ; Q=1', True),
+        ('application/x-cargo-calculate;q=0, application/json', False),
+        ('application/x-cargo-calculate; q=0.0', False),
+        ('application/x-cargo-calculate;q=x', False),
+        ('application/x-cargo-calculate-v2', False),
+        ('*/*', False),
+        ('application/json', False),
+        (None, False),
+    ],
+)
+def test_accepts_binary(accept, expected):
+    assert binary_protocol.accepts_binary(accept) is expected
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import pytest
+
+from cargoapi.utils.changes import RECONNECT_DELAY_MS, TariffChangeHub
+
+
+def event_id(frame: str) -> str:
+    return next(line for line in frame.splitlines() if line.startswith('id: '))[len('id: '):]
+
+
+def event_data(frame: str) -> dict:
+    return json.loads(next(line for line in frame.splitlines() if line.startswith('data: '))[len('data: '):])
+
+
+def test_parse_last_event_id():
+    hub = TariffChangeHub(history_size=10)
+    assert hub.parse_last_event_id(f'{hub.epoch}:5') == 5
+    assert hub.parse_last_event_id(f'{hub.epoch}:0') == 0
+    for foreign in (None, '', '5', f'{hub.epoch}:', f'{hub.epoch}:-1', f'{hub.epoch}:x', 'deadbeef:5'):
+        assert hub.parse_last_event_id(foreign) is None
+
+
+def test_initial_frame_and_heartbeat_carry_id():
+    async def run():
+        hub = TariffChangeHub(history_size=10)
+        hub.publish('UPDATE')
+        stream = hub.stream(None, heartbeat=0.01)
+        frames = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return hub, frames
+
+    hub, (initial, ping) = asyncio.run(run())
+    assert initial == f'retry: {RECONNECT_DELAY_MS}\nid: {hub.epoch}:1\n\n'
+    assert ping == f': ping\nid: {hub.epoch}:1\n\n'
+    assert hub.subscribers == 0
+
+
+def test_live_change():
+    async def run():
+        hub = TariffChangeHub(history_size=10)
+        stream = hub.stream(None, heartbeat=10)
+        await anext(stream)
+        next_frame = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        hub.publish('DELETE', uid='abc')
+        frame = await next_frame
+        await stream.aclose()
+        return hub, frame
+
+    hub, frame = asyncio.run(run())
+    assert event_id(frame) == f'{hub.epoch}:1'
+    assert 'event: tariff' in frame
+    assert event_data(frame) == {'seq': 1, 'action': 'DELETE', 'uid': 'abc'}
+
+
+def test_resume_replays_missed_changes():
+    async def run():
+        hub = TariffChangeHub(history_size=10)
+        for action in ('INSERT', 'UPDATE', 'DELETE'):
+            hub.publish(action)
+        stream = hub.stream(f'{hub.epoch}:1', heartbeat=10)
+        frames = [await anext(stream) for _ in range(3)]
+        await stream.aclose()
+        return hub, frames
+
+    hub, (initial, second, third) = asyncio.run(run())
+    assert event_id(initial) == f'{hub.epoch}:1'
+    assert [event_data(second)['action'], event_data(third)['action']] == ['UPDATE', 'DELETE']
+    assert event_id(third) == f'{hub.epoch}:3'
+
+
+@pytest.mark.parametrize('last_event_id', ['deadbeef:1', 'garbage'])
+def test_foreign_epoch_resets(last_event_id):
+    async def run():
+        hub = TariffChangeHub(history_size=10)
+        hub.publish('UPDATE')
+        stream = hub.stream(last_event_id, heartbeat=10)
+        frames = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return hub, frames
+
+    hub, (reset, initial) = asyncio.run(run())
+    assert 'event: reset' in reset
+    assert event_id(reset) == hub.version
+    # No replay of the old changes after a reset, the stream continues from the current version
+    assert event_id(initial) == hub.version
+
+
+def test_missed_out_of_history():
+    hub = TariffChangeHub(history_size=2)
+    for action in ('INSERT', 'UPDATE', 'DELETE'):
+        hub.publish(action)
+    assert hub._missed(3) == []
+    assert [seq for seq, _ in hub._missed(1)] == [2, 3]
+    assert hub._missed(0) is None
+
+
+def test_fell_out_of_history_resets():
+    async def run():
+        hub = TariffChangeHub(history_size=2)
+        for action in ('INSERT', 'UPDATE', 'DELETE'):
+            hub.publish(action)
+        stream = hub.stream(f'{hub.epoch}:0', heartbeat=0.01)
+        frames = [await anext(stream) for _ in range(3)]
+        await stream.aclose()
+        return hub, frames
+
+    hub, (initial, reset, ping) = asyncio.run(run())
+    assert event_id(initial) == f'{hub.epoch}:0'
+    assert 'event: reset' in reset
+    assert event_id(reset) == f'{hub.epoch}:3'
+    assert ping == f': ping\nid: {hub.epoch}:3\n\n'
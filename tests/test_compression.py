@@ -0,0 +1,155 @@
+import asyncio
+import datetime
+import gzip
+import uuid
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.datastructures import MutableHeaders
+
+from cargoapi.api.v1.endpoints import cargos
+from cargoapi.core.config import settings
+from cargoapi.database import get_session
+from cargoapi.schemas.cargos import CargoTariffResponse
+from cargoapi.utils.cache import TTLCache
+from cargoapi.utils.compression import BROTLI, GZIP, CompressionMiddleware, ResponseCompressor
+
+TARIFFS = [
+    CargoTariffResponse(
+        uid=uuid.uuid4(),
+        tariff_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=i),
+        rate=0.01,
+        to_cargo_type_uid=uuid.uuid4(),
+        created_at=datetime.datetime(2024, 1, 1),
+        updated_at=datetime.datetime(2024, 1, 1),
+    )
+    for i in range(50)
+]
+
+
+@pytest.fixture
+def cargos_client(monkeypatch):
+    # The router alone, like main.py without CompressionMiddleware
+    app = FastAPI()
+    app.include_router(cargos.router)
+    app.dependency_overrides[get_session] = lambda: None
+    monkeypatch.setattr(cargos, 'cargos_response_cache', TTLCache(ttl=60, max_size=10))
+    monkeypatch.setattr(cargos.cargo_service, 'get_all_cargos_tariff', mock.AsyncMock(return_value=TARIFFS))
+    return TestClient(app)
+
+
+def test_cached_cargos_compressed(cargos_client):
+    response = cargos_client.get('/cargos/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert len(response.json()) == len(TARIFFS)
+
+
+def test_cached_cargos_compression_disabled(cargos_client, monkeypatch):
+    monkeypatch.setattr(settings, 'COMPRESSION_ENABLED', False)
+    response = cargos_client.get('/cargos/', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert len(response.json()) == len(TARIFFS)
+
+
+@pytest.fixture
+def compressor():
+    return ResponseCompressor(minimum_size=100, gzip_level=6, brotli_quality=4)
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [
+        (None, None),
+        ('', None),
+        ('gzip', GZIP),
+        ('GZIP;q=0.5, identity', GZIP),
+        ('gzip;q=0', None),
+        ('gzip;q=0.0, deflate', None),
+        ('gzip;q=0.001', GZIP),
+        ('*', GZIP),
+        ('*, gzip;q=0', None),
+        ('deflate', None),
+    ],
+)
+def test_negotiate_gzip(accept_encoding, expected):
+    compressor = ResponseCompressor(minimum_size=0, gzip_level=6, brotli_quality=4)
+    compressor.encodings = (GZIP,)
+    assert compressor.negotiate(accept_encoding) == expected
+
+
+@pytest.mark.skipif(BROTLI not in ResponseCompressor(0, 1, 1).encodings, reason='brotli is not installed')
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [('gzip, br', BROTLI), ('*', BROTLI), ('br;q=0, gzip', GZIP), ('br;q=0, *', GZIP)],
+)
+def test_negotiate_brotli(compressor, accept_encoding, expected):
+    assert compressor.negotiate(accept_encoding) == expected
+
+
+def make_app(body_chunks, headers=None):
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers or []})
+        for index, chunk in enumerate(body_chunks):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': index < len(body_chunks) - 1})
+
+    return app
+
+
+def call(middleware, accept_encoding=b'gzip'):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/', 'headers': [(b'accept-encoding', accept_encoding)]}
+    asyncio.run(middleware(scope, None, send))
+    start, *bodies = messages
+    return MutableHeaders(raw=start['headers']), b''.join(message.get('body', b'') for message in bodies)
+
+
+def test_middleware_compresses(compressor):
+    body = b'x' * 1000
+    headers, content = call(CompressionMiddleware(make_app([body]), compressor))
+    assert headers['content-encoding'] == GZIP
+    assert headers['vary'] == 'Accept-Encoding'
+    assert headers['content-length'] == str(len(content))
+    assert gzip.decompress(content) == body
+
+
+def test_middleware_below_minimum_size(compressor):
+    headers, content = call(CompressionMiddleware(make_app([b'x' * 99]), compressor))
+    assert 'content-encoding' not in headers
+    assert content == b'x' * 99
+
+
+def test_middleware_not_accepted(compressor):
+    headers, content = call(CompressionMiddleware(make_app([b'x' * 1000]), compressor), accept_encoding=b'identity')
+    assert 'content-encoding' not in headers
+    assert content == b'x' * 1000
+
+
+@pytest.mark.parametrize(
+    'headers',
+    [
+        [(b'content-encoding', b'br')],
+        [(b'content-type', b'text/event-stream; charset=utf-8')],
+    ],
+)
+def test_middleware_passthrough(compressor, headers):
+    chunks = [b'x' * 1000, b'y' * 1000]
+    app = make_app(chunks, headers)
+    response_headers, content = call(CompressionMiddleware(app, compressor, exclude_media_types=('text/event-stream',)))
+    assert response_headers.get('content-encoding') != GZIP
+    assert content == b''.join(chunks)
+
+
+def test_middleware_stream(compressor):
+    # The first chunk alone is below minimum_size, a streamed response is compressed anyway
+    chunks = [b'a' * 10, b'b' * 1000, b'', b'c' * 500]
+    app = make_app(chunks, headers=[(b'content-length', b'1510'), (b'content-type', b'application/json')])
+    headers, content = call(CompressionMiddleware(app, compressor))
+    assert headers['content-encoding'] == GZIP
+    assert 'content-length' not in headers
+    assert gzip.decompress(content) == b''.join(chunks)
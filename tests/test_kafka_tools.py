@@ -0,0 +1,143 @@
+import asyncio
+import uuid
+from unittest import mock
+
+import pytest
+from aiokafka.errors import KafkaError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from cargoapi.api.v1.endpoints import cargos, health
+from cargoapi.utils import kafka_tools
+from cargoapi.utils.kafka_tools import CircuitBreaker, KafkaProducerService, KafkaUnavailableError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(kafka_tools.time, 'monotonic', clock)
+    return clock
+
+
+def make_service(failure_threshold: int = 3, connect_retry_delay: float = 0.05) -> KafkaProducerService:
+    return KafkaProducerService(
+        bootstrap_servers='localhost:9092',
+        connect_timeout=1,
+        send_timeout=1,
+        breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=30),
+        connect_retry_delay=connect_retry_delay,
+    )
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_breaker_half_open_after_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    # A failed trial call opens the breaker again
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 30
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_success_resets_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_send_before_connected():
+    async def run():
+        service = make_service()
+        with mock.patch.object(service, '_connect', mock.AsyncMock()) as connect:
+            with pytest.raises(KafkaUnavailableError):
+                await service.send_message('cargo', {'message': {}})
+            await asyncio.sleep(0)
+        # The failed send schedules the lazy connection
+        connect.assert_awaited_once()
+        assert service.state == CircuitBreaker.CLOSED
+
+    asyncio.run(run())
+
+
+def test_send_with_open_breaker():
+    async def run():
+        service = make_service(failure_threshold=1)
+        service._producer = mock.Mock(send_and_wait=mock.AsyncMock(side_effect=KafkaError()))
+        with pytest.raises(KafkaError):
+            await service.send_message('cargo', {'message': {}})
+        with pytest.raises(KafkaUnavailableError):
+            await service.send_message('cargo', {'message': {}})
+        service._producer.send_and_wait.assert_awaited_once()
+
+    asyncio.run(run())
+
+
+def test_failed_connects_back_off(monkeypatch):
+    producer = mock.Mock(start=mock.AsyncMock(side_effect=KafkaError()), stop=mock.AsyncMock())
+    monkeypatch.setattr(kafka_tools, 'AIOKafkaProducer', mock.Mock(return_value=producer))
+
+    async def run():
+        service = make_service(failure_threshold=100, connect_retry_delay=0.05)
+        service.start_in_background()
+        await asyncio.sleep(0.12)
+        await service.stop()
+        assert not service.is_connected
+
+    asyncio.run(run())
+    assert 2 <= producer.start.await_count <= 3
+
+
+def test_connect(monkeypatch):
+    producer = mock.Mock(start=mock.AsyncMock(side_effect=[KafkaError(), None]), stop=mock.AsyncMock())
+    monkeypatch.setattr(kafka_tools, 'AIOKafkaProducer', mock.Mock(return_value=producer))
+
+    async def run():
+        service = make_service(connect_retry_delay=0)
+        service.start_in_background()
+        await service._connect_task
+        assert service.state == 'connected'
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize(('database_ok', 'status_code'), [(True, 200), (False, 503)])
+def test_readiness(monkeypatch, database_ok, status_code):
+    monkeypatch.setattr(health, 'ping_db', mock.AsyncMock(return_value=database_ok))
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+    assert client.get('/health/live').json() == {'status': 'ok'}
+    response = client.get('/health/ready')
+    assert response.status_code == status_code
+    if database_ok:
+        assert response.json() == {'status': 'ok', 'database': 'ok', 'kafka': health.kafka_producer.state}
+
+
+@pytest.mark.parametrize('error', [KafkaUnavailableError('not connected'), asyncio.TimeoutError(), KafkaError()])
+def test_tariff_event_send_failure_is_logged(monkeypatch, caplog, error):
+    monkeypatch.setattr(cargos.kafka_producer, 'send_message', mock.AsyncMock(side_effect=error))
+    asyncio.run(cargos._send_tariff_event(uuid.uuid4(), 'UPDATE'))
+    assert 'Tariff UPDATE event of user' in caplog.text
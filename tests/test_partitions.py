@@ -0,0 +1,122 @@
+import asyncio
+import sys
+from datetime import date
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+
+from cargoapi.services import cargos_service
+from cargoapi.services.cargos_service import CargoService
+from cargoapi.utils import partitions
+from cargoapi.utils.tariff_validation import validate_tariffs_file
+
+
+def test_create_partition_sql():
+    assert partitions._create_partition_sql(2024) == (
+        'CREATE TABLE IF NOT EXISTS cargo_tariffs_y2024 PARTITION OF cargo_tariffs '
+        "FOR VALUES FROM ('2024-01-01') TO ('2025-01-01')"
+    )
+    sql = partitions._create_partition_sql(1999, parent='cargo_tariffs_partitioned')
+    assert sql.endswith("PARTITION OF cargo_tariffs_partitioned FOR VALUES FROM ('1999-01-01') TO ('2000-01-01')")
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    conn = mock.AsyncMock()
+    conn.execution_options.return_value = conn
+    context = mock.AsyncMock()
+    context.__aenter__.return_value = conn
+    monkeypatch.setattr(partitions, 'async_engine', mock.Mock(connect=mock.Mock(return_value=context)))
+    monkeypatch.setattr(partitions, 'attached_partition_years', mock.AsyncMock(return_value=list(range(2019, 2026))))
+    return conn
+
+
+@pytest.mark.parametrize(
+    ('keep_years', 'archived_years'),
+    [(1, [2019, 2020, 2021, 2022, 2023]), (3, [2019, 2020, 2021]), (6, []), (10, [])],
+)
+def test_archive_cut_off_year(connection, keep_years, archived_years):
+    archived = asyncio.run(partitions.archive_tariff_partitions(keep_years, today=date(2024, 5, 1)))
+    assert archived == [partitions.archive_name(year) for year in archived_years]
+    statements = [str(call.args[0]) for call in connection.execute.await_args_list]
+    assert len(statements) == 2 * len(archived_years)
+    if archived_years:
+        assert statements[:2] == [
+            'ALTER TABLE cargo_tariffs DETACH PARTITION cargo_tariffs_y2019 CONCURRENTLY',
+            'ALTER TABLE cargo_tariffs_y2019 RENAME TO cargo_tariffs_archive_y2019',
+        ]
+    connection.execution_options.assert_awaited_once_with(isolation_level='AUTOCOMMIT')
+
+
+def run_main(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, 'argv', ['partitions', *args])
+    with pytest.raises(SystemExit) as exit_info:
+        partitions.main()
+    captured = capsys.readouterr()
+    return exit_info.value.code, captured.out + captured.err
+
+
+@pytest.mark.parametrize(('command', 'enable'), [('enable', True), ('disable', False)])
+def test_main_switch(monkeypatch, capsys, command, enable):
+    switch = mock.AsyncMock(return_value='cargo_tariffs is now partitioned by year')
+    monkeypatch.setattr(partitions, '_switch_partitioning', switch)
+    assert run_main(monkeypatch, capsys, command) == (0, 'cargo_tariffs is now partitioned by year\n')
+    switch.assert_awaited_once_with(enable)
+
+
+def test_main_archive(monkeypatch, capsys):
+    archive = mock.AsyncMock(return_value=['cargo_tariffs_archive_y2019', 'cargo_tariffs_archive_y2020'])
+    monkeypatch.setattr(partitions, 'archive_tariff_partitions', archive)
+    code, output = run_main(monkeypatch, capsys, 'archive', '--keep-years', '3')
+    assert (code, output) == (0, 'Detached cargo_tariffs_archive_y2019\nDetached cargo_tariffs_archive_y2020\n')
+    archive.assert_awaited_once_with(3)
+
+
+def test_main_archive_nothing(monkeypatch, capsys):
+    monkeypatch.setattr(partitions, 'archive_tariff_partitions', mock.AsyncMock(return_value=[]))
+    assert run_main(monkeypatch, capsys, 'archive', '--keep-years', '2') == (0, 'Nothing to archive\n')
+
+
+def test_main_archive_disabled(monkeypatch, capsys):
+    archive = mock.AsyncMock()
+    monkeypatch.setattr(partitions, 'archive_tariff_partitions', archive)
+    # TARIFF_PARTITION_KEEP_YEARS defaults to 0
+    assert run_main(monkeypatch, capsys, 'archive') == (0, 'Archival is disabled (keep years < 1)\n')
+    archive.assert_not_awaited()
+
+
+@pytest.mark.parametrize('args', [(), ('drop',), ('archive', '--keep-years', 'x')])
+def test_main_invalid_arguments(monkeypatch, capsys, args):
+    assert run_main(monkeypatch, capsys, *args)[0] == 2
+
+
+UPLOAD_ROWS = validate_tariffs_file(
+    b'{"2024-01-01": [{"cargo_type": "Glass", "rate": 0.3}], '
+    b'"2019-12-31": [{"cargo_type": "Glass", "rate": 0.1}, {"cargo_type": "Wood", "rate": 0.2}]}',
+).rows
+
+
+def test_upload_archived_years(monkeypatch):
+    ensure = mock.AsyncMock(return_value=[2019])
+    monkeypatch.setattr(cargos_service, 'ensure_tariff_partitions', ensure)
+    session = mock.AsyncMock()
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(CargoService.upload_json_cargo_tariffs(UPLOAD_ROWS, session))
+    assert exc_info.value.status_code == 422
+    ensure.assert_awaited_once_with({2019, 2024})
+    session.execute.assert_not_awaited()
+
+
+def test_upload_change_event_bounds(monkeypatch):
+    ensure = mock.AsyncMock(return_value=[])
+    monkeypatch.setattr(cargos_service, 'ensure_tariff_partitions', ensure)
+    hub = mock.Mock()
+    monkeypatch.setattr(cargos_service, 'tariff_change_hub', hub)
+    session = mock.AsyncMock()
+    session.add = mock.Mock()
+    session.execute.return_value = mock.Mock(**{'scalars.return_value.first.return_value': None})
+    result = asyncio.run(CargoService.upload_json_cargo_tariffs(UPLOAD_ROWS, session))
+    assert result == {'created_types': 2, 'updated_types': 1, 'created_tariffs': 3, 'updated_tariffs': 0}
+    ensure.assert_awaited_once_with({2019, 2024})
+    hub.publish.assert_called_once_with('upload', date_from=date(2019, 12, 31), date_to=date(2024, 1, 1), **result)
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from cargoapi.utils.profiler import ProfileStore, ProfilingMiddleware, render_folded
+
+
+async def slow_app(scope, receive, send):
+    time.sleep(0.05)
+    await send({'type': 'http.response.start', 'status': 201, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+def request(middleware, store):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        scope = {'type': 'http', 'method': 'GET', 'path': '/slow', 'headers': [(b'x-profile', b'token')]}
+        await middleware(scope, None, send)
+        # The profile is stored by the sampler thread once it finished
+        for _ in range(100):
+            if store.summaries():
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    return messages
+
+
+def test_profiled_request():
+    store = ProfileStore(max_size=10)
+    middleware = ProfilingMiddleware(slow_app, store, token='token', sample_rate=0, interval=0.5, max_seconds=5)
+    messages = request(middleware, store)
+
+    (summary,) = store.summaries()
+    assert (b'x-profile-id', summary['id'].encode()) in messages[0]['headers']
+    assert summary['status_code'] == 201
+    assert summary['path'] == '/slow'
+    assert summary['duration_ms'] >= 50
+    assert render_folded(store.get(summary['id'])['folded']) == ''
+
+
+def test_samples():
+    store = ProfileStore(max_size=10)
+    middleware = ProfilingMiddleware(slow_app, store, token='token', sample_rate=0, interval=0.005, max_seconds=5)
+    request(middleware, store)
+    (summary,) = store.summaries()
+    assert summary['samples'] > 0
+    assert 'slow_app' in render_folded(store.get(summary['id'])['folded'])
@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from cargoapi.core.config import settings
+from cargoapi.database import get_session
+from cargoapi.main import app
+from cargoapi.utils import tariff_validation
+from cargoapi.utils.tariff_validation import (
+    DUPLICATE_DATE_ERROR,
+    _split_file,
+    validate_tariffs_file,
+    validate_tariffs_segment,
+)
+
+DUPLICATE_DATES_FILE = (
+    b'{"2024-01-01": [{"cargo_type": "Glass", "rate": 0.1}], '
+    b'"2024-01-02": [{"cargo_type": "Glass", "rate": 0.2}], '
+    b'"2024-01-01": [{"cargo_type": "Other", "rate": 0.3}]}'
+)
+
+
+@pytest.fixture
+def parallel_validation(monkeypatch):
+    monkeypatch.setattr(settings, 'TARIFF_VALIDATION_PARALLEL_THRESHOLD_BYTES', 0)
+    monkeypatch.setattr(settings, 'TARIFF_VALIDATION_WORKERS', 3)
+    yield
+    tariff_validation.shutdown_process_pool()
+
+
+def test_file_duplicate_date():
+    report = validate_tariffs_file(DUPLICATE_DATES_FILE)
+    assert report.error_count == 1
+    assert report.errors == [
+        {'tariff_date': '2024-01-01', 'index': None, 'field': 'tariff_date', 'error': DUPLICATE_DATE_ERROR},
+    ]
+
+
+def test_parallel_duplicate_date(parallel_validation):
+    report = asyncio.run(tariff_validation.validate_cargo_tariffs(DUPLICATE_DATES_FILE))
+    assert report.errors == validate_tariffs_file(DUPLICATE_DATES_FILE).errors
+
+
+def test_parallel_rows(parallel_validation):
+    raw_file = json.dumps(
+        {f'2024-01-{day:02}': [{'cargo_type': 'Glass', 'rate': day}] for day in range(1, 10)},
+    ).encode()
+    report = asyncio.run(tariff_validation.validate_cargo_tariffs(raw_file))
+    assert report.error_count == 0
+    assert sorted(report.rows) == sorted(validate_tariffs_file(raw_file).rows)
+
+
+def test_split_file_at_date_entries():
+    raw_file = json.dumps(
+        {f'2024-01-{day:02}': [{'cargo_type': 'Glass', 'rate': day}] for day in range(1, 10)},
+    ).encode()
+    segments = _split_file(raw_file, 3)
+    assert len(segments) == 3
+    assert all(segment.startswith(b'"2024-01-') and not segment.endswith(b',') for segment in segments)
+    assert json.loads(b'{' + b','.join(segments) + b'}') == json.loads(raw_file)
+
+
+@pytest.mark.parametrize('parts', [1, 2, 10])
+def test_split_file_parts(parts):
+    raw_file = b' {"2024-01-01": [], "2024-01-02": []} '
+    segments = _split_file(raw_file, parts)
+    assert json.loads(b'{' + b','.join(segments) + b'}') == {'2024-01-01': [], '2024-01-02': []}
+    assert len(segments) <= parts
+
+
+@pytest.mark.parametrize('raw_file', [b'[]', b'{"2024-01-01": []', b'"{}"', b''])
+def test_split_file_not_an_object(raw_file):
+    assert _split_file(raw_file, 2) is None
+
+
+def test_segment():
+    report = validate_tariffs_segment(b'"2024-01-01": [{"cargo_type": "Glass", "rate": 0.5}, {"cargo_type": "Glass"}]')
+    assert list(report.rows) == [(datetime.date(2024, 1, 1), 'Glass', 0.5)]
+    assert report.errors == [
+        {'tariff_date': '2024-01-01', 'index': 1, 'field': 'cargo_type', 'error': 'Duplicate cargo type for this date'},
+    ]
+
+
+@pytest.mark.parametrize(
+    'segment',
+    [
+        # Split at a date key of a nested object
+        b'"2024-01-01": [{"cargo_type": "Glass", ',
+        b'"2024-01-05": [], "rate": 1}]',
+        b'"2024-01-01": [], ',
+    ],
+)
+def test_segment_invalid_json(segment):
+    assert validate_tariffs_segment(segment) is None
+
+
+def test_parallel_false_boundary(parallel_validation):
+    tariff = {'cargo_type': 'Glass', 'rate': 1, 'note': 'x' * 300, '2024-02-01': []}
+    raw_file = json.dumps({'2024-01-01': [tariff], '2024-01-02': [], '2024-01-03': []}).encode()
+    assert any(validate_tariffs_segment(segment) is None for segment in _split_file(raw_file, 3))
+    report = asyncio.run(tariff_validation.validate_cargo_tariffs(raw_file))
+    assert report.error_count == 0
+    assert len(report.rows) == 1
+
+
+def test_load_invalid_rows():
+    app.dependency_overrides[get_session] = lambda: None
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                '/api/v1/cargos/load',
+                files={'upload_file': ('tariffs.json', DUPLICATE_DATES_FILE, 'application/json')},
+            )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 422
+    assert response.json() == {
+        'detail': 'Cargo tariffs file has invalid rows, nothing was uploaded.',
+        'error_count': 1,
+        'errors': [{'tariff_date': '2024-01-01', 'index': None, 'field': 'tariff_date', 'error': DUPLICATE_DATE_ERROR}],
+    }
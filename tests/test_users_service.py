@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+import uuid
+from typing import Optional
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from cargoapi.api.v1.endpoints import users
+from cargoapi.database import get_session
+from cargoapi.schemas.users import CurrentUser, UserCreate
+from cargoapi.services import users_service
+from cargoapi.services.users_service import UserService
+from cargoapi.utils import cache
+from cargoapi.utils.cache import TTLCache
+
+USER_UID = uuid.uuid4()
+USER_ROW = mock.Mock(uid=USER_UID, username='user', created_at=datetime.datetime(2024, 1, 1))
+
+
+def make_session(commit_error: Optional[Exception] = None, user_row: Optional[mock.Mock] = USER_ROW) -> mock.Mock:
+    session = mock.AsyncMock()
+    session.add = mock.Mock()
+    session.commit.side_effect = commit_error
+    session.execute.return_value = mock.Mock(**{'one_or_none.return_value': user_row})
+    return session
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def profile_cache(monkeypatch, clock):
+    profile_cache = TTLCache(ttl=60, max_size=10)
+    monkeypatch.setattr(users_service, 'user_profile_cache', profile_cache)
+    return profile_cache
+
+
+def test_create_user():
+    session = make_session()
+    user = asyncio.run(UserService().create_user(UserCreate(username='user', password='secret'), session))
+    assert user.username == 'user'
+    assert user.password != 'secret'
+    session.add.assert_called_once_with(user)
+    session.rollback.assert_not_awaited()
+
+
+def test_create_user_username_taken():
+    session = make_session(commit_error=IntegrityError('INSERT', {}, Exception('duplicate key')))
+    assert asyncio.run(UserService().create_user(UserCreate(username='user', password='secret'), session)) is None
+    session.rollback.assert_awaited_once()
+
+
+def test_create_user_endpoint_username_taken():
+    session = make_session(commit_error=IntegrityError('INSERT', {}, Exception('duplicate key')))
+    app = FastAPI()
+    app.include_router(users.router)
+    app.dependency_overrides[get_session] = lambda: session
+    response = TestClient(app).post('/users/create', json={'username': 'user', 'password': 'secret'})
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Username is already taken'}
+
+
+def test_profile_cache_hit(profile_cache):
+    session = make_session()
+    first = asyncio.run(UserService().get_user_profile(USER_UID, session))
+    second = asyncio.run(UserService().get_user_profile(USER_UID, session))
+    assert first == CurrentUser(uid=USER_UID, username='user', created_at=datetime.datetime(2024, 1, 1))
+    assert second is first
+    session.execute.assert_awaited_once()
+
+
+def test_profile_cache_miss(profile_cache):
+    session = make_session()
+    asyncio.run(UserService().get_user_profile(USER_UID, session))
+    asyncio.run(UserService().get_user_profile(uuid.uuid4(), session))
+    assert session.execute.await_count == 2
+
+
+def test_profile_cache_expiry(profile_cache, clock):
+    session = make_session()
+    asyncio.run(UserService().get_user_profile(USER_UID, session))
+    clock[0] += 61
+    asyncio.run(UserService().get_user_profile(USER_UID, session))
+    assert session.execute.await_count == 2
+
+
+def test_unknown_user_not_cached(profile_cache):
+    session = make_session(user_row=None)
+    assert asyncio.run(UserService().get_user_profile(USER_UID, session)) is None
+    assert profile_cache.get(str(USER_UID)) is None